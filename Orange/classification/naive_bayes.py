@@ -47,14 +47,16 @@ class NaiveBayesModel(Model):
         if isinstance(data, Instance):
             data = [data]
         ncv = len(self.domain.class_var.values)
+        log_priors = np.log(
+            (1 + self.class_freq) / (ncv + sum(self.class_freq)))
         probs = np.zeros((len(data), ncv))
         for i, ins in enumerate(data):
+            x = ins.x
             for c in range(ncv):
-                py = (1 + self.class_freq[c]) / (ncv + sum(self.class_freq))
-                log_prob = np.log(py)
+                log_prob = log_priors[c]
                 for ai, a in enumerate(self.domain.attributes):
-                    if not np.isnan(ins[a]):
-                        relevant = 1 + self.cont[ai][c][a.to_val(ins[a])]
+                    if not np.isnan(x[ai]):
+                        relevant = 1 + self.cont[ai][c][int(x[ai])]
                         total = len(a.values) + self.class_freq[c]
                         log_prob += np.log(relevant / total)
                 probs[i, c] = log_prob
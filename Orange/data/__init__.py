@@ -4,3 +4,5 @@ from .variable import *
 from .domain import *
 from .storage import *
 from .table import *
+from .columnar import *
+from .sharedmem import *
@@ -1,3 +1,5 @@
+#cython: language_level=2
+
 import numpy as np
 cimport numpy as np
 import scipy.sparse as sp
@@ -109,17 +111,31 @@ cdef inline void resize_if_needed(np.ndarray a, size):
     if dim[0] != size:
         a.resize(size, refcheck=False)
 
+cdef np.ndarray grown(np.ndarray a):
+    """Return a copy of the array with twice the length"""
+    cdef np.ndarray b = np.empty(2 * np.PyArray_DIMS(a)[0], a.dtype)
+    b[:np.PyArray_DIMS(a)[0]] = a
+    return b
+
 cdef enum ColKinds:
     ATTRIBUTE, CLASS, META
 
+# initial sizes of buffers; they are doubled when needed
+INITIAL_ROWS = 1024
+INITIAL_VALUES = 4096
+# the number of bytes that sparse_read_float reads from the file at once
+READ_CHUNK = 2 ** 16
+
 @cython.wraparound(False)
 def sparse_read_float(fname):
-    n_attrs, n_classes, n_metas, n_lines = sparse_prescan_fast(fname)
-
+    """
+    Read a basket file given by its name (as bytes) or as a binary file
+    object, such as a decompressing stream; the file is read in chunks of
+    READ_CHUNK bytes.
+    """
     cdef:
         State state
         char c
-        int ci
         char *not_in_atom = "#,|;\n\r\x00"
         int col, line, cur_line
         int in_line
@@ -134,28 +150,39 @@ def sparse_read_float(fname):
         float value, decs
         char col_kind
 
-        # n_lines + 2 -- +2 instead of +1 is needed for the empty last line
-        # it is removed in the end
-        np.ndarray[np.float_t, ndim=1] X_data = np.empty(n_attrs, float)
-        np.ndarray[np.int32_t, ndim=1] X_indices = np.empty(n_attrs, np.int32)
-        np.ndarray[np.int32_t, ndim=1] X_indptr = np.empty(n_lines + 2, np.int32)
+        # the file is read in a single pass; buffers grow as needed and
+        # are trimmed in the end
+        np.ndarray[np.float_t, ndim=1] X_data = np.empty(INITIAL_VALUES, float)
+        np.ndarray[np.int32_t, ndim=1] X_indices = np.empty(INITIAL_VALUES, np.int32)
+        np.ndarray[np.int32_t, ndim=1] X_indptr = np.empty(INITIAL_ROWS, np.int32)
 
-        np.ndarray[np.float_t, ndim=1] Y_data = np.empty(n_classes, float)
-        np.ndarray[np.int32_t, ndim=1] Y_indices = np.empty(n_classes, np.int32)
-        np.ndarray[np.int32_t, ndim=1] Y_indptr = np.empty(n_lines + 2, np.int32)
+        np.ndarray[np.float_t, ndim=1] Y_data = np.empty(INITIAL_VALUES, float)
+        np.ndarray[np.int32_t, ndim=1] Y_indices = np.empty(INITIAL_VALUES, np.int32)
+        np.ndarray[np.int32_t, ndim=1] Y_indptr = np.empty(INITIAL_ROWS, np.int32)
 
-        np.ndarray[np.float_t, ndim=1] metas_data = np.empty(n_metas, float)
-        np.ndarray[np.int32_t, ndim=1] metas_indices = np.empty(n_metas, np.int32)
-        np.ndarray[np.int32_t, ndim=1] metas_indptr = np.empty(n_lines + 2, np.int32)
+        np.ndarray[np.float_t, ndim=1] metas_data = np.empty(INITIAL_VALUES, float)
+        np.ndarray[np.int32_t, ndim=1] metas_indices = np.empty(INITIAL_VALUES, np.int32)
+        np.ndarray[np.int32_t, ndim=1] metas_indptr = np.empty(INITIAL_ROWS, np.int32)
 
         dict attr_indices = {}
         dict class_indices = {}
         dict meta_indices = {}
 
-    cdef FILE *f = fopen(fname, "rb")
-    if f == NULL:
-        raise IOError("File '{}' cannot be opened".format(fname))
-
+        bytes chunk = b""
+        char *buf = chunk
+        Py_ssize_t buf_pos = 0
+        Py_ssize_t buf_len = 0
+
+    if isinstance(fname, bytes):
+        try:
+            f = open(fname, "rb")
+        except OSError:
+            raise IOError("File '{}' cannot be opened".format(fname))
+        own_file = True
+    else:
+        f = fname
+        own_file = False
+    read = f.read
 
     X_indptr[0] = Y_indptr[0] = metas_indptr[0] = 0
     line = 0
@@ -169,6 +196,10 @@ def sparse_read_float(fname):
                 col_kind = ATTRIBUTE
                 if in_line or line == 0:
                     line += 1
+                    if line == X_indptr.shape[0]:
+                        X_indptr = grown(X_indptr)
+                        Y_indptr = grown(Y_indptr)
+                        metas_indptr = grown(metas_indptr)
                     X_indptr[line] = X_indptr[line - 1]
                     Y_indptr[line] = Y_indptr[line - 1]
                     metas_indptr[line] = metas_indptr[line - 1]
@@ -178,12 +209,17 @@ def sparse_read_float(fname):
                 state = READ_START_ATOM
 
             if state != END_LINE and state != SET_VALUE:
-                ci = fgetc(f)
-                if ci == EOF:
+                if buf_pos == buf_len:
+                    chunk = read(READ_CHUNK)
+                    buf = chunk
+                    buf_len = len(chunk)
+                    buf_pos = 0
+                if buf_len == 0:
                     f_eof = 1
                     c = "\x00"
                 else:
-                    c = <char>ci
+                    c = buf[buf_pos]
+                    buf_pos += 1
                 col += 1
 
             if state == READ_START_ATOM:
@@ -330,16 +366,25 @@ def sparse_read_float(fname):
             if state == SET_VALUE:
                 if col_kind == ATTRIBUTE:
                     ii = X_indptr[line]
+                    if ii == X_data.shape[0]:
+                        X_data = grown(X_data)
+                        X_indices = grown(X_indices)
                     X_data[ii] = value
                     X_indices[ii] = attr_index
                     X_indptr[line] = X_indptr[line] + 1
                 elif col_kind == CLASS:
                     ii = Y_indptr[line]
+                    if ii == Y_data.shape[0]:
+                        Y_data = grown(Y_data)
+                        Y_indices = grown(Y_indices)
                     Y_data[ii] = value
                     Y_indices[ii] = attr_index
                     Y_indptr[line] = Y_indptr[line] + 1
                 else:
                     ii = metas_indptr[line]
+                    if ii == metas_data.shape[0]:
+                        metas_data = grown(metas_data)
+                        metas_indices = grown(metas_indices)
                     metas_data[ii] = value
                     metas_indices[ii] = attr_index
                     metas_indptr[line] = metas_indptr[line] + 1
@@ -384,10 +429,11 @@ def sparse_read_float(fname):
 
             elif state == CARRIAGE_RETURNED:
                 if c != "\n" and not f_eof:
-                    ungetc(c, f)
+                    buf_pos -= 1
                 state = BEGIN_LINE
     finally:
-        fclose(f)
+        if own_file:
+            f.close()
 
     if in_line == 0:
         line -= 1
@@ -396,14 +442,14 @@ def sparse_read_float(fname):
     for t_data, t_indices, t_indptr, ll in [
              (X_data, X_indices, X_indptr, attr_indices),
              (Y_data, Y_indices, Y_indptr, class_indices),
-             (metas_data, metas_indices, metas_indptr, metas_indices)]:
+             (metas_data, metas_indices, metas_indptr, meta_indices)]:
         if t_indptr[line]:
             resize_if_needed(t_indptr, line + 1)
             resize_if_needed(t_indices, t_indptr[line])
             resize_if_needed(t_data, t_indptr[line])
-            row_err, col = check_csr_matrix(t_indptr, t_indices, len(t_names))
+            row_err, col = check_csr_matrix(t_indptr, t_indices, len(ll))
             if row_err >= 0:
-                for name, attr_col in t_names.items():
+                for name, attr_col in ll.items():
                     if col == attr_col:
                         break
                 raise ValueError("Duplicate values of '{}' in row {}".
@@ -0,0 +1,449 @@
+import operator
+import zlib
+from itertools import chain
+from numbers import Integral
+
+import numpy as np
+from scipy import sparse as sp
+
+from Orange.data import DiscreteVariable, StringVariable
+from Orange.data.table import Table
+
+
+class CodedColumn:
+    """
+    A dictionary-encoded column of strings: integer codes into an array of
+    distinct values. Repeated strings take four bytes per row and missing
+    values (`None`) are coded as -1.
+
+    Comparisons with a string and the methods :obj:`map` and :obj:`lower`
+    are computed on the distinct values and then spread over rows by
+    indexing with codes, so filters do not need to decode the column.
+    Indexing with an integer gives a string; converting to a numpy array
+    decodes the column.
+
+    .. attribute:: codes
+
+        An array of type `StringVariable.storage_dtype` with indices into
+        `categories`, or -1 for missing values.
+
+    .. attribute:: categories
+
+        An object array with the values; they are distinct and sorted in
+        columns constructed by :obj:`from_values`.
+    """
+    def __init__(self, codes, categories):
+        self.codes = codes
+        self.categories = categories
+
+    @classmethod
+    def from_values(cls, values, dtype=np.int32):
+        """Encode a sequence of strings; `None` is encoded as missing."""
+        values = np.asarray(values, dtype=object).ravel()
+        defined = values != None  # pylint: disable=singleton-comparison
+        codes = np.full(len(values), -1, dtype=dtype)
+        categories, codes[defined] = \
+            np.unique(values[defined], return_inverse=True)
+        return cls(codes, categories)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, rows):
+        if isinstance(rows, Integral):
+            code = self.codes[rows]
+            return self.categories[code] if code >= 0 else None
+        return CodedColumn(self.codes[rows], self.categories)
+
+    def __iter__(self):
+        return iter(self.decode())
+
+    def __array__(self, dtype=None, copy=None):
+        return self.decode().astype(dtype or object, copy=False)
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.categories.nbytes
+
+    def decode(self):
+        """Return an object array with strings and `None` for missing."""
+        return self._spread(self.categories, None)
+
+    def _spread(self, results, missing):
+        # Index results for categories with codes; the extra item at the end
+        # is picked by code -1
+        results = np.append(results, np.array([missing], dtype=results.dtype))
+        return results[self.codes]
+
+    def map(self, func):
+        """
+        Return a boolean array with the results of predicate `func` for
+        values in the column; `func` is called once for each distinct value.
+        Missing values give `False`.
+        """
+        return self._spread(
+            np.fromiter(map(func, self.categories), dtype=bool,
+                        count=len(self.categories)),
+            False)
+
+    def lower(self):
+        """Return a column with values in lower case."""
+        return CodedColumn(
+            self.codes, np.array([s.lower() for s in self.categories], object))
+
+    def _compare(self, op, value):
+        return self._spread(np.asarray(op(self.categories, value), dtype=bool),
+                            op is operator.ne)
+
+    def __eq__(self, value):
+        return self._compare(operator.eq, value)
+
+    def __ne__(self, value):
+        return self._compare(operator.ne, value)
+
+    def __lt__(self, value):
+        return self._compare(operator.lt, value)
+
+    def __le__(self, value):
+        return self._compare(operator.le, value)
+
+    def __gt__(self, value):
+        return self._compare(operator.gt, value)
+
+    def __ge__(self, value):
+        return self._compare(operator.ge, value)
+
+    __hash__ = None
+
+    def checksum(self, cs=1):
+        """
+        Update the Adler-32 checksum with the column's values; the result
+        does not depend upon unused or repeated categories.
+        """
+        values, codes = np.unique(self.categories, return_inverse=True)
+        codes = np.append(codes, -1)[self.codes]
+        used, codes = np.unique(codes, return_inverse=True)
+        cs = zlib.adler32(codes.astype(np.int32), cs)
+        used = used[used >= 0]
+        return zlib.adler32("\0".join(values[used]).encode("utf-8"), cs)
+
+
+def encode_column(var, values):
+    """
+    Encode a column of values, as stored in a `Table`, into the type given
+    by the variable's `storage_dtype`. Discrete values are stored as integer
+    indices with -1 for unknowns and strings as a :obj:`CodedColumn`.
+    """
+    dtype = var.storage_dtype
+    if isinstance(var, DiscreteVariable):
+        values = values.astype(float)
+        codes = np.full(len(values), -1, dtype=dtype)
+        defined = ~np.isnan(values)
+        codes[defined] = values[defined]
+        return codes
+    if isinstance(var, StringVariable):
+        if isinstance(values, CodedColumn):
+            return values
+        return CodedColumn.from_values(values, dtype)
+    return values.astype(dtype)
+
+
+def decode_column(var, column):
+    """
+    Decode a column stored by :obj:`encode_column` into float values (for
+    primitive variables) or objects.
+    """
+    if isinstance(column, CodedColumn):
+        return column.decode()
+    if isinstance(var, DiscreteVariable):
+        values = column.astype(float)
+        values[column < 0] = np.nan
+        return values
+    if var.is_primitive():
+        return column.astype(float)
+    return column
+
+
+class LazyColumn:
+    """
+    A column that is computed from the source table on the first access.
+
+    .. attribute:: source
+
+        The source table.
+
+    .. attribute:: col
+
+        An index of the column in the source table, a function that
+        computes the column from the source table (like `compute_value`)
+        or `None` if the column is unknown.
+
+    .. attribute:: rows
+
+        Indices of the source rows, or `...` for all.
+    """
+    def __init__(self, source, col, rows=...):
+        self.source = source
+        self.col = col
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.source) if self.rows is ... else len(self.rows)
+
+    def __getitem__(self, rows):
+        if self.rows is not ...:
+            rows = self.rows[rows]
+        elif not isinstance(rows, np.ndarray) or rows.dtype == bool:
+            rows = np.arange(len(self.source))[rows]
+        return LazyColumn(self.source, self.col, rows)
+
+    nbytes = 0
+
+    def compute(self, var):
+        """Compute the column's values for the variable `var`."""
+        col, rows = self.col, self.rows
+        if col is None:
+            return np.full(len(self), "" if isinstance(var, StringVariable)
+                           else np.nan, dtype=object)
+        if isinstance(col, Integral):
+            values = self.source.get_column_view(col)[0]
+        else:
+            values = col(self.source)
+        return values if rows is ... else values[rows]
+
+
+# noinspection PyPep8Naming
+class ColumnarTable(Table):
+    """
+    A table which stores each variable's values in a separate column of the
+    type given by the variable's `storage_dtype`; for instance discrete
+    values take one byte per row instead of eight.
+
+    Matrices `X`, `Y` and `metas` are constructed on the first access, so
+    code written for :obj:`Table` works unchanged. Once constructed, the
+    matrix replaces the compact columns for its part of the domain, hence
+    changes of its values are kept; call :obj:`compact` to encode them
+    again. Sparse data is not supported.
+
+    Tables constructed by :obj:`from_table` with `lazy=True` compute each
+    column from the source table on its first access.
+    """
+    _dense_X = _dense_Y = _dense_metas = None
+
+    @classmethod
+    def from_table(cls, domain, source, row_indices=..., lazy=False):
+        """
+        Construct a columnar table from (selected rows of) an existing table,
+        converted to the given domain, like :obj:`Table.from_table`.
+
+        If `lazy` is set, columns, including those of variables computed by
+        their `compute_value`, are not computed until they are accessed.
+        The table keeps a reference to the source.
+        """
+        if isinstance(source, ColumnarTable) and domain == source.domain:
+            return source._select_rows(row_indices)
+        if not lazy:
+            return cls._from_dense(
+                Table.from_table(domain, source, row_indices))
+
+        self = cls.__new__(cls)
+        self.domain = domain
+        self.name = getattr(source, "name", "")
+        self.ids = np.array(source.ids[row_indices])
+        if source.has_weights():
+            self.W = np.array(source.W[row_indices])
+        else:
+            self.W = np.empty((len(self.ids), 0))
+        if row_indices is not ...:
+            row_indices = np.arange(len(source))[row_indices]
+        conversion = domain.get_conversion(source.domain)
+        self.columns_data = {
+            var: LazyColumn(source, col, row_indices)
+            for var, col in zip(chain(domain.variables, domain.metas),
+                                chain(conversion.attributes,
+                                      conversion.class_vars,
+                                      conversion.metas))}
+        return self
+
+    @classmethod
+    def from_table_rows(cls, source, row_indices):
+        """
+        Construct a columnar table by selecting rows from the source table.
+        Rows of a columnar table are selected column by column.
+        """
+        if isinstance(source, ColumnarTable):
+            return source._select_rows(row_indices)
+        return cls._from_dense(Table.from_table_rows(source, row_indices))
+
+    @classmethod
+    def from_numpy(cls, domain, X, Y=None, metas=None, W=None):
+        """
+        Construct a columnar table from numpy arrays, like
+        :obj:`Table.from_numpy`.
+        """
+        return cls._from_dense(Table.from_numpy(domain, X, Y, metas, W))
+
+    @classmethod
+    def from_file(cls, filename):
+        """Read a table from a file and store it in columns."""
+        data = Table.from_file(filename)
+        self = cls._from_dense(data)
+        self.name = data.name
+        return self
+
+    @classmethod
+    def _from_dense(cls, data):
+        if any(sp.issparse(part) for part in (data.X, data._Y, data.metas)):
+            raise ValueError("Columnar tables do not support sparse data")
+        self = cls.__new__(cls)
+        self.domain = data.domain
+        self.name = getattr(data, "name", "")
+        self.W = data.W
+        self.ids = data.ids
+        self.columns_data = {}
+        for var, values in self._parts(data):
+            self.columns_data[var] = encode_column(var, values)
+        return self
+
+    def _parts(self, data):
+        domain = self.domain
+        for variables, arr in ((domain.attributes, data.X),
+                               (domain.class_vars, data._Y),
+                               (domain.metas, data.metas)):
+            for i, var in enumerate(variables):
+                yield var, arr[:, i]
+
+    def _select_rows(self, row_indices):
+        if self._dense_X is not None or self._dense_Y is not None \
+                or self._dense_metas is not None:
+            return ColumnarTable._from_dense(
+                Table.from_table_rows(self, row_indices))
+        self_ = ColumnarTable.__new__(ColumnarTable)
+        self_.domain = self.domain
+        self_.name = self.name
+        self_.W = self.W[row_indices]
+        self_.ids = np.array(self.ids[row_indices])
+        self_.columns_data = {var: column[row_indices]
+                              for var, column in self.columns_data.items()}
+        return self_
+
+    def _column(self, var):
+        column = self.columns_data[var]
+        if isinstance(column, LazyColumn):
+            column = self.columns_data[var] = \
+                encode_column(var, column.compute(var))
+        return column
+
+    def _decode_part(self, variables, dtype):
+        arr = np.empty((len(self), len(variables)), dtype=dtype)
+        for i, var in enumerate(variables):
+            arr[:, i] = decode_column(var, self._column(var))
+            del self.columns_data[var]
+        return arr
+
+    @property
+    def X(self):
+        if self._dense_X is None:
+            self._dense_X = self._decode_part(self.domain.attributes, float)
+        return self._dense_X
+
+    @X.setter
+    def X(self, value):
+        self._dense_X = value
+        for var in self.domain.attributes:
+            self.columns_data.pop(var, None)
+
+    @property
+    def _Y(self):
+        if self._dense_Y is None:
+            self._dense_Y = self._decode_part(self.domain.class_vars, float)
+        return self._dense_Y
+
+    @_Y.setter
+    def _Y(self, value):
+        self._dense_Y = value
+        for var in self.domain.class_vars:
+            self.columns_data.pop(var, None)
+
+    @property
+    def metas(self):
+        if self._dense_metas is None:
+            self._dense_metas = self._decode_part(self.domain.metas, object)
+        return self._dense_metas
+
+    @metas.setter
+    def metas(self, value):
+        self._dense_metas = value
+        for var in self.domain.metas:
+            self.columns_data.pop(var, None)
+
+    def compact(self):
+        """
+        Encode the matrices that were constructed since the table was
+        created or last compacted back into compact columns.
+        """
+        dense = [self._dense_X, self._dense_Y, self._dense_metas]
+        if any(part is not None and sp.issparse(part) for part in dense):
+            raise ValueError("Columnar tables do not support sparse data")
+        for variables, part in zip(
+                (self.domain.attributes, self.domain.class_vars,
+                 self.domain.metas), dense):
+            if part is not None:
+                for i, var in enumerate(variables):
+                    self.columns_data[var] = encode_column(var, part[:, i])
+        self._dense_X = self._dense_Y = self._dense_metas = None
+
+    @property
+    def nbytes(self):
+        """The number of bytes taken by the table's values."""
+        dense = [self._dense_X, self._dense_Y, self._dense_metas]
+        return sum(column.nbytes for column in self.columns_data.values()) + \
+            sum(part.nbytes for part in dense if part is not None)
+
+    def __len__(self):
+        for part in (self._dense_X, self._dense_Y, self._dense_metas):
+            if part is not None:
+                return part.shape[0]
+        for column in self.columns_data.values():
+            return len(column)
+        return len(self.ids)
+
+    def get_column_view(self, index):
+        """
+        Return a column of the table and a flag telling whether it is sparse
+        (always `False`). Columns that are still stored compactly are
+        decoded without constructing the matrix, so the result is a copy,
+        except for strings, which are returned as a :obj:`CodedColumn`.
+        """
+        if not isinstance(index, Integral):
+            index = self.domain.index(index)
+        var = self.domain[index]
+        if var not in self.columns_data:
+            return super().get_column_view(index)
+        column = self._column(var)
+        if isinstance(column, CodedColumn):
+            return column, False
+        return decode_column(var, column), False
+
+    def checksum(self, include_metas=True):
+        """
+        Return a checksum over values and weights. Values are hashed column
+        by column without constructing matrices; strings are hashed by their
+        contents, so the checksum is the same for tables with same values.
+        """
+        domain = self.domain
+        variables = domain.variables
+        if include_metas:
+            variables += domain.metas
+        cs = 1
+        for var in variables:
+            column = self.get_column_view(var)[0]
+            if isinstance(var, StringVariable) and \
+                    not isinstance(column, CodedColumn):
+                column = CodedColumn.from_values(column)
+            if isinstance(column, CodedColumn):
+                cs = column.checksum(cs)
+            else:
+                column = decode_column(var, column)
+                cs = zlib.adler32(np.ascontiguousarray(column), cs)
+        return zlib.adler32(np.ascontiguousarray(self.W), cs)
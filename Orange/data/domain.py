@@ -2,10 +2,14 @@ from collections import Iterable
 from itertools import chain
 from numbers import Integral
 
-import weakref
 from .variable import *
 import numpy as np
 
+from Orange.misc.cache import LRUCache
+
+# the number of conversions from other domains that a domain keeps
+CONVERSION_CACHE_SIZE = 32
+
 
 class DomainConversion:
     """
@@ -117,7 +121,7 @@ class Domain:
             for idx, var in enumerate(self.metas)))
 
         self.anonymous = False
-        self._known_domains = weakref.WeakKeyDictionary()
+        self._known_domains = LRUCache(CONVERSION_CACHE_SIZE)
         self._last_conversion = None
 
     # noinspection PyPep8Naming
@@ -243,7 +247,7 @@ class Domain:
 
     def __setstate__(self, state):
         self.__dict__.update(state)
-        self._known_domains = weakref.WeakKeyDictionary()
+        self._known_domains = LRUCache(CONVERSION_CACHE_SIZE)
 
     def index(self, var):
         """
@@ -286,7 +290,9 @@ class Domain:
         given source domain to this domain. Domain conversions are cached to
         speed-up the conversion in the common case in which the domain
         is based on another domain, for instance, when the domain contains
-        discretized variables from another domain.
+        discretized variables from another domain. The cache keeps the
+        conversions from :obj:`CONVERSION_CACHE_SIZE` most recently used
+        source domains.
 
         :param source: the source domain
         :type source: Orange.data.Domain
@@ -295,10 +301,11 @@ class Domain:
         c = self._last_conversion
         if c and c.source is source:
             return c
-        c = self._known_domains.get(source, None)
+        c = self._known_domains.get((source, ))
         if not c:
             c = DomainConversion(source, self)
-            self._known_domains[source] = self._last_conversion = c
+            self._known_domains.set((source, ), c)
+        self._last_conversion = c
         return c
 
     # noinspection PyProtectedMember
@@ -345,6 +352,53 @@ class Domain:
         return np.array(values[:nattrs]), np.array(values[nattrs:]),\
                np.array(metas, dtype=object)
 
+    def convert_batch(self, instances):
+        """
+        Convert a table or a sequence of data instances to this domain.
+
+        Unlike :obj:`convert`, which handles a single instance, instances are
+        grouped by their domains and each group is converted at once: values
+        are copied with numpy indexing and `compute_value` of each variable is
+        called once per group instead of once per instance. Sequences of
+        values are converted with :obj:`convert`.
+
+        :param instances: data instances to be converted
+        :type instances: Orange.data.Table or a sequence of instances
+        :return: a tuple with arrays of attributes, classes and metas
+        """
+        from .instance import Instance
+        from .table import Table
+
+        if isinstance(instances, Table):
+            table = Table.from_table(self, instances)
+            return table.X, table._Y, table.metas
+
+        instances = list(instances)
+        n = len(instances)
+        X = np.empty((n, len(self.attributes)))
+        Y = np.empty((n, len(self.class_vars)))
+        metas = np.empty((n, len(self.metas)), dtype=object)
+        groups = {}
+        for i, inst in enumerate(instances):
+            if isinstance(inst, Instance):
+                groups.setdefault(inst.domain, []).append(i)
+            else:
+                X[i], Y[i], metas[i] = self.convert(inst)
+        for domain, rows in groups.items():
+            group = [instances[i] for i in rows]
+            shape = (len(rows), -1)
+            source = Table.from_numpy(
+                domain,
+                np.array([inst._x for inst in group]).reshape(shape),
+                np.array([inst._y for inst in group]).reshape(shape),
+                np.array([inst._metas for inst in group],
+                         dtype=object).reshape(shape))
+            table = Table.from_table(self, source)
+            X[rows] = table.X
+            Y[rows] = table._Y
+            metas[rows] = table.metas
+        return X, Y, metas
+
     def select_columns(self, col_idx):
         attributes, col_indices = self._compute_col_indices(col_idx)
         if attributes is not None:
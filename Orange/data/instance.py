@@ -6,6 +6,10 @@ import numpy as np
 
 
 class Instance:
+    # Slots make attribute access faster and instances smaller; subclasses
+    # that need other attributes declare their own slots
+    __slots__ = ("_domain", "_x", "_y", "_metas", "_weight", "__weakref__")
+
     def __init__(self, domain, data=None):
         """
         Construct a new data instance.
@@ -30,7 +34,7 @@ class Instance:
             self._x = np.array(data._x)
             self._y = np.array(data._y)
             self._metas = np.array(data._metas)
-            self._weight = data._weight
+            self._weight = data.weight
         else:
             self._x, self._y, self._metas = domain.convert(data)
             self._weight = 1
@@ -1,8 +1,13 @@
+import bz2
 import csv
+import gzip
+import lzma
+import os
 import re
-import sys
 import pickle
-from itertools import chain
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 
 import bottlechest as bn
 import numpy as np
@@ -14,6 +19,31 @@ from Orange.data import Domain
 from Orange.data.variable import *
 
 
+# Functions for opening compressed files, by extensions of compressions
+COMPRESSIONS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def split_compression(filename):
+    """
+    Split the file name into the name without the extension of compression
+    and the extension of compression (an empty string if the file is not
+    compressed), e.g. `("iris.tab", ".gz")` for `"iris.tab.gz"`.
+    """
+    base, ext = os.path.splitext(filename)
+    if ext in COMPRESSIONS:
+        return base, ext
+    return filename, ""
+
+
+def open_compressed(filename, mode="rt"):
+    """
+    Open the file; if the file name has an extension of one of supported
+    compressions, the file is decompressed (or compressed) on the fly.
+    """
+    return COMPRESSIONS.get(split_compression(filename)[1], open)(
+        filename, mode)
+
+
 # A singleton simulated with a class
 class FileFormats:
     formats = []
@@ -35,6 +65,54 @@ class FileFormats:
         return f
 
 
+class SparseRowsAccumulator:
+    """
+    Accumulate sparse rows in a single pass over the data and return them
+    as a CSR matrix. Buffers for values and column indices are doubled when
+    full. Columns are given by names and numbered in order of appearance.
+    """
+    def __init__(self, capacity=4096):
+        self.names = {}
+        self.data = np.empty(capacity)
+        self.indices = np.empty(capacity, np.int32)
+        self.indptr = [0]
+
+    def add_row(self, items):
+        """
+        Add a row, given as a sequence of pairs (column name, value).
+        """
+        names = self.names
+        nnz = self.indptr[-1]
+        seen = set()
+        for name, value in items:
+            if nnz == len(self.data):
+                self.data.resize(2 * nnz, refcheck=False)
+                self.indices.resize(2 * nnz, refcheck=False)
+            col = names.setdefault(name, len(names))
+            if col in seen:
+                raise ValueError("Duplicate values of '{}' in row {}".
+                                 format(name, len(self.indptr)))
+            seen.add(col)
+            self.data[nnz] = value
+            self.indices[nnz] = col
+            nnz += 1
+        self.indptr.append(nnz)
+
+    def column_names(self):
+        """Return the list of column names in order of column indices"""
+        return sorted(self.names, key=self.names.get)
+
+    def tocsr(self):
+        """Return the accumulated rows as a CSR matrix"""
+        nnz = self.indptr[-1]
+        mat = sparse.csr_matrix(
+            (self.data[:nnz], self.indices[:nnz],
+             np.array(self.indptr, dtype=np.int32)),
+            (len(self.indptr) - 1, len(self.names)))
+        mat.sort_indices()
+        return mat
+
+
 class FileReader:
     def prescan_file(self, f, delim, nvars, disc_cols, cont_cols):
         values = [set() for _ in range(nvars)]
@@ -136,60 +214,187 @@ class TabDelimFormat:
         domain = Domain(attributes, class_vars, metas)
         return domain
 
-    def count_lines(self, file):
-        file.seek(0)
-        i = -3
-        for _ in file:
-            i += 1
-        return i
+    # number of lines that are read, split and converted at once
+    CHUNK_SIZE = 10000
+
+    def read_chunks(self, f, chunk_size=None):
+        """
+        Yield the data part of the file in chunks of at most `chunk_size`
+        (default: `CHUNK_SIZE`) non-empty lines. Each chunk is a 2d object
+        array of stripped strings with `n_columns` columns; short lines are
+        padded with empty strings.
+        """
+        chunk_size = chunk_size or self.CHUNK_SIZE
+        line_count = 0
+        while True:
+            lines = list(islice(f, chunk_size))
+            if not lines:
+                return
+            rows = []
+            for lne in lines:
+                if not lne.strip():
+                    continue
+                values = lne.split("\t")
+                if len(values) > self.n_columns:
+                    raise ValueError("Too many columns in line {}".
+                                     format(4 + line_count))
+                elif len(values) < self.n_columns:
+                    values += [""] * (self.n_columns - len(values))
+                rows.append(values)
+                line_count += 1
+            if rows:
+                # a 2d array of str would be as wide as the longest value
+                # in the chunk, so the columns are filled one by one
+                chunk = np.empty((len(rows), self.n_columns), dtype=object)
+                for col, values in enumerate(zip(*rows)):
+                    chunk[:, col] = [s.strip() for s in values]
+                yield chunk
+
+    @staticmethod
+    def _convert_continuous(var, column):
+        column = column.astype(str)
+        unknown = np.in1d(column, [s for s in var.unknown_str
+                                   if s is not None])
+        known = column[~unknown]
+        if var.adjust_decimals and len(known):
+            dots = np.char.find(known, ".")
+            ndec = int(np.max(np.where(
+                dots > 0, np.char.str_len(known) - dots - 1, 0)))
+            if ndec > var.number_of_decimals or var.adjust_decimals == 2:
+                var.number_of_decimals = ndec
+                var.adjust_decimals = 1
+        values = np.empty(len(column))
+        values[unknown] = np.nan
+        values[~unknown] = known.astype(float)
+        return values
+
+    @staticmethod
+    def _convert_discrete(var, column):
+        uniques, first, inverse = np.unique(
+            column, return_index=True, return_inverse=True)
+        codes = np.empty(len(uniques))
+        # add new values in the order of their first appearance
+        for i in np.argsort(first, kind="mergesort"):
+            codes[i] = var.val_from_str_add(uniques[i])
+        return codes[inverse.ravel()]
+
+    @classmethod
+    def _convert_column(cls, var, column):
+        if isinstance(var, ContinuousVariable):
+            return cls._convert_continuous(var, column)
+        if isinstance(var, DiscreteVariable):
+            return cls._convert_discrete(var, column)
+        if isinstance(var, StringVariable):
+            return column.astype(object)
+        return np.array([var.val_from_str_add(s) for s in column],
+                        dtype=object)
+
+    @staticmethod
+    def _grow(arr, n_rows):
+        arr.resize((n_rows, ) + arr.shape[1:], refcheck=False)
+
+    def convert_chunk(self, chunk, domain):
+        """
+        Convert a chunk of strings, as given by :obj:`read_chunks`, to arrays
+        of attributes, class values, meta attributes and weights.
+        """
+        n_rows = len(chunk)
+        arrays = []
+        for columns, variables, dtype in (
+                (self.attribute_columns, domain.attributes, float),
+                (self.classvar_columns, domain.class_vars, float),
+                (self.meta_columns, domain.metas, object)):
+            arr = np.empty((n_rows, len(columns)), dtype=dtype)
+            for i, ((col, _), var) in enumerate(zip(columns, variables)):
+                arr[:, i] = self._convert_column(var, chunk[:, col])
+            arrays.append(arr)
+        if self.weight_column >= 0:
+            arrays.append(chunk[:, self.weight_column].astype(float))
+        else:
+            arrays.append(np.empty((n_rows, 0)))
+        return arrays
 
     def read_data(self, f, table):
-        X, Y = table.X, table._Y
-        W = table.W if table.W.shape[-1] else None
         f.seek(0)
         f.readline()
         f.readline()
         f.readline()
-        padding = [""] * self.n_columns
+        arrays = [table.X, table._Y, table.metas, table.W]
         if self.basket_column >= 0:
-            # TODO how many columns?!
-            table._Xsparse = sparse.lil_matrix(len(X), 100)
-        table.metas = metas = (
-            np.empty((len(X), len(self.meta_columns)), dtype=object))
+            self.basket = SparseRowsAccumulator()
         line_count = 0
-        Xr = None
-        for lne in f:
-            values = lne
-            if not values.strip():
-                continue
-            values = values.split("\t")
-            if len(values) > self.n_columns:
-                raise ValueError("Too many columns in line {}".
-                                 format(4 + line_count))
-            elif len(values) < self.n_columns:
-                values += padding
-            if self.attribute_columns:
-                Xr = X[line_count]
-                for i, (col, reader) in enumerate(self.attribute_columns):
-                    Xr[i] = reader(values[col].strip())
-            for i, (col, reader) in enumerate(self.classvar_columns):
-                Y[line_count, i] = reader(values[col].strip())
-            if W is not None:
-                W[line_count] = float(values[self.weight_column])
-            for i, (col, reader) in enumerate(self.meta_columns):
-                metas[line_count, i] = reader(values[col].strip())
-            line_count += 1
-        if line_count != len(X):
-            del Xr, X, Y, W, metas
-            table.X.resize(line_count, len(table.domain.attributes))
-            table._Y.resize(line_count, len(table.domain.class_vars))
-            if table.W.ndim == 1:
-                table.W.resize(line_count)
-            else:
-                table.W.resize((line_count, 0))
-            table.metas.resize((line_count, len(self.meta_columns)))
+        for chunk in self.read_chunks(f):
+            n_chunk = len(chunk)
+            if line_count + n_chunk > len(arrays[0]):
+                capacity = max(2 * len(arrays[0]), line_count + n_chunk)
+                for arr in arrays:
+                    self._grow(arr, capacity)
+            converted = self.convert_chunk(chunk, table.domain)
+            for arr, part in zip(arrays, converted):
+                arr[line_count:line_count + n_chunk] = part
+            if self.basket_column >= 0:
+                self.read_basket(chunk)
+            line_count += n_chunk
+        for arr in arrays:
+            self._grow(arr, line_count)
+        table.X, table._Y, table.metas, table.W = arrays
         table.n_rows = line_count
 
+    @staticmethod
+    def parse_basket(s):
+        """
+        Parse the value of a basket column, e.g. `"a=2, b, c=1.5"`,
+        into pairs of names and values; the default value is 1.
+        """
+        for item in s.split(","):
+            name, eq, value = item.partition("=")
+            name = name.strip()
+            if name:
+                yield name, float(value) if eq else 1.0
+
+    def read_basket(self, chunk):
+        """Add the basket column of the chunk to `basket`"""
+        for s in chunk[:, self.basket_column]:
+            self.basket.add_row(self.parse_basket(s))
+
+    def add_basket(self, table):
+        """
+        Append the columns from the basket column to the attributes;
+        the table's `X` becomes sparse.
+        """
+        domain = table.domain
+        basket_vars = [ContinuousVariable.make(name)
+                       for name in self.basket.column_names()]
+        table.domain = Domain(domain.attributes + tuple(basket_vars),
+                              domain.class_vars, domain.metas)
+        table.X = sparse.hstack((sparse.csr_matrix(table.X),
+                                 self.basket.tocsr())).tocsr()
+
+    def read_batches(self, filename, batch_size, cls=None):
+        """
+        Read the file in batches of at most `batch_size` rows and yield them
+        as tables that share the same domain.
+
+        Unlike in :obj:`read_file`, the values of discrete variables are not
+        sorted, but kept in the order of appearance, so that the values
+        in earlier batches remain valid.
+        """
+        from ..data import Table
+        if cls is None:
+            cls = Table
+        with open_compressed(filename) as f:
+            domain = self.read_header(f)
+            if self.basket_column >= 0:
+                raise ValueError("Files with basket columns cannot be read "
+                                 "in batches")
+            for chunk in self.read_chunks(f, batch_size):
+                table = cls.from_domain(domain, 0, self.weight_column >= 0)
+                table.X, table._Y, table.metas, table.W = \
+                    self.convert_chunk(chunk, domain)
+                table.n_rows = len(chunk)
+                cls._init_ids(table)
+                yield table
+
     def reorder_values_array(self, arr, variables):
         newvars = []
         for col, var in enumerate(variables):
@@ -212,7 +417,7 @@ class TabDelimFormat:
         table.domain = Domain(attrs, classes, metas=metas)
 
     def read_file(self, filename, cls=None):
-        with open(filename) as file:
+        with open_compressed(filename) as file:
             return self._read_file(file, cls)
 
     def _read_file(self, file, cls=None):
@@ -220,18 +425,61 @@ class TabDelimFormat:
         if cls is None:
             cls = Table
         domain = self.read_header(file)
-        nExamples = self.count_lines(file)
-        table = cls.from_domain(domain, nExamples, self.weight_column >= 0)
+        table = cls.from_domain(domain, 0, self.weight_column >= 0)
         self.read_data(file, table)
+        cls._init_ids(table)
         self.reorder_values(table)
+        if self.basket_column >= 0:
+            self.add_basket(table)
         return table
 
+    # the number of rows that are formatted and written at once
+    WRITE_BLOCK_SIZE = 10000
+
+    @staticmethod
+    def _format_column(var, col):
+        """
+        Return a sequence with textual representations of values in `col`,
+        equal to those given by `var.repr_val`.
+        """
+        if isinstance(var, ContinuousVariable):
+            col = col.astype(float)
+            formatted = np.char.mod(var._out_format, col).astype(object)
+            formatted[np.isnan(col)] = "?"
+            return formatted
+        if isinstance(var, DiscreteVariable):
+            col = col.astype(float)
+            labels = np.array([str(val) for val in var.values] + ["?"],
+                              dtype=object)
+            col[np.isnan(col)] = len(var.values)
+            return labels[col.astype(int)]
+        return [var.repr_val(val) for val in col]
+
+    @staticmethod
+    def _can_write_fast(data):
+        """Tell whether the data is stored in dense numpy arrays."""
+        try:
+            arrays = (data.X, data._Y, data.metas)
+        except (AttributeError, ValueError):
+            return False
+        return all(isinstance(arr, np.ndarray) for arr in arrays)
+
     @classmethod
     def _write_fast(cls, f, data):
-        wa = [var.repr_val for var in data.domain.variables + data.domain.metas]
-        for Xi, Yi, Mi in zip(data.X, data._Y, data.metas):
-            f.write("\t".join(w(val) for val, w in zip(chain(Xi, Yi, Mi), wa)))
-            f.write("\n")
+        domain = data.domain
+        parts = ((data.X, domain.attributes), (data._Y, domain.class_vars),
+                 (data.metas, domain.metas))
+        n_rows = len(data)
+        for start in range(0, n_rows, cls.WRITE_BLOCK_SIZE):
+            stop = min(start + cls.WRITE_BLOCK_SIZE, n_rows)
+            columns = [cls._format_column(var, arr[start:stop, i])
+                       for arr, variables in parts
+                       for i, var in enumerate(variables)]
+            if columns:
+                lines = map("\t".join, zip(*columns))
+            else:
+                lines = [""] * (stop - start)
+            f.write("".join(line + "\n" for line in lines))
 
     @classmethod
     def write_file(cls, filename, data):
@@ -247,7 +495,7 @@ class TabDelimFormat:
         :type data: Orange.data.Storage
         """
         if isinstance(filename, str):
-            f = open(filename, "w")
+            f = open_compressed(filename, "wt")
         else:
             f = filename
         domain_vars = data.domain.variables + data.domain.metas
@@ -279,20 +527,40 @@ class TabDelimFormat:
         f.write("\n")
 
         # data
-        # noinspection PyBroadException
-        try:
+        if cls._can_write_fast(data):
             cls._write_fast(f, data)
-        except:
+        else:
             domain_vars = [data.domain.index(var) for var in domain_vars]
             for i in data:
                 f.write("\t".join(str(i[j]) for j in domain_vars) + "\n")
         f.close()
 
 
+def _parse_txt_lines(lines, delimiter, n_columns):
+    lines = [lne for lne in lines if lne.strip()]
+    if not lines:
+        return np.empty((0, n_columns))
+    arr = np.genfromtxt(lines, delimiter=delimiter,
+                        missing_values=TxtFormat.MISSING_VALUES)
+    return arr.reshape(len(lines), n_columns)
+
+
+def _parse_txt_range(filename, start, stop, delimiter, n_columns):
+    with open(filename, "rb") as file:
+        file.seek(start)
+        lines = file.read(stop - start).splitlines()
+    return _parse_txt_lines(lines, delimiter, n_columns)
+
+
 @FileFormats.register("Comma-separated file", ".txt")
 class TxtFormat:
     MISSING_VALUES = frozenset({"", "NA", "?"})
 
+    # files larger than this are parsed by multiple processes
+    PARALLEL_SIZE = 32 * 2 ** 20
+    # the number of processes; `None` uses all processors
+    N_JOBS = None
+
     @staticmethod
     def read_header(file, delimiter=None):
         first_line = file.readline()
@@ -320,18 +588,87 @@ class TxtFormat:
         from ..data import Table
         if cls is None:
             cls = Table
-        with open(filename, "rt") as file:
+        with open_compressed(filename, "rt") as file:
             domain, header_lines, delimiter = self.read_header(file)
-        with open(filename, "rb") as file:
-            arr = np.genfromtxt(file, delimiter=delimiter,
-                                skip_header=header_lines,
-                                missing_values=self.MISSING_VALUES)
+        if not split_compression(filename)[1] and \
+                os.path.getsize(filename) > self.PARALLEL_SIZE:
+            arr = self.read_parallel(filename, header_lines, delimiter,
+                                     len(domain.attributes))
+        else:
+            with open_compressed(filename, "rb") as file:
+                arr = np.genfromtxt(file, delimiter=delimiter,
+                                    skip_header=header_lines,
+                                    missing_values=self.MISSING_VALUES)
         table = cls.from_numpy(domain, arr)
         return table
 
+    @staticmethod
+    def split_ranges(filename, start, n_parts):
+        """
+        Split the file from byte `start` to the end into (at most) `n_parts`
+        ranges of approximately equal sizes that begin at starts of lines.
+
+        :return: a list of pairs (start, stop)
+        """
+        size = os.path.getsize(filename)
+        bounds = [start]
+        with open(filename, "rb") as file:
+            for i in range(1, n_parts):
+                pos = start + (size - start) * i // n_parts
+                if pos <= bounds[-1]:
+                    continue
+                file.seek(pos - 1)
+                file.readline()
+                pos = file.tell()
+                if pos >= size:
+                    break
+                if pos > bounds[-1]:
+                    bounds.append(pos)
+        bounds.append(size)
+        return list(zip(bounds, bounds[1:]))
+
+    def read_parallel(self, filename, header_lines, delimiter, n_columns):
+        """
+        Split the file into ranges aligned on line boundaries, parse them
+        in a pool of processes and return the concatenated array.
+        """
+        with open(filename, "rb") as file:
+            for _ in range(header_lines):
+                file.readline()
+            start = file.tell()
+        n_jobs = self.N_JOBS or os.cpu_count() or 1
+        ranges = self.split_ranges(filename, start, n_jobs)
+        with ProcessPoolExecutor(n_jobs) as executor:
+            futures = [executor.submit(_parse_txt_range, filename, begin, end,
+                                       delimiter, n_columns)
+                       for begin, end in ranges]
+            return np.vstack([future.result() for future in futures])
+
+    def read_batches(self, filename, batch_size, cls=None):
+        """
+        Read the file in batches of at most `batch_size` rows and yield them
+        as tables that share the same domain.
+        """
+        from ..data import Table
+        if cls is None:
+            cls = Table
+        with open_compressed(filename, "rt") as file:
+            domain, header_lines, delimiter = self.read_header(file)
+        with open_compressed(filename, "rb") as file:
+            for _ in range(header_lines):
+                file.readline()
+            while True:
+                lines = list(islice(file, batch_size))
+                if not lines:
+                    return
+                arr = _parse_txt_lines(lines, delimiter,
+                                       len(domain.attributes))
+                if len(arr):
+                    yield cls.from_numpy(domain, arr)
+
     @classmethod
     def csv_saver(cls, filename, data, delimiter='\t'):
-        with open(filename, 'w') as csvfile:
+        with open_compressed(filename, 'wt') as csvfile:
             writer = csv.writer(csvfile, delimiter=delimiter)
             all_vars = data.domain.variables + data.domain.metas
             writer.writerow([v.name for v in all_vars])  # write variable names
@@ -363,20 +700,24 @@ class BasketFormat:
     def read_file(cls, filename, storage_class=None):
         if storage_class is None:
             from ..data import Table as storage_class
+
         def constr_vars(inds):
             if inds:
                 return [ContinuousVariable(x.decode("utf-8")) for _, x in
                         sorted((ind, name) for name, ind in inds.items())]
 
-        X, Y, metas, attr_indices, class_indices, meta_indices = \
-            _io.sparse_read_float(filename.encode(sys.getdefaultencoding()))
+        # the parser reads chunks from the file object, so compressed files
+        # are decompressed as they are read
+        with open_compressed(filename, "rb") as f:
+            X, Y, metas, attr_indices, class_indices, meta_indices = \
+                _io.sparse_read_float(f)
 
         attrs = constr_vars(attr_indices)
         classes = constr_vars(class_indices)
         meta_attrs = constr_vars(meta_indices)
         domain = Domain(attrs, classes, meta_attrs)
         return storage_class.from_numpy(
-            domain, attrs and X, classes and Y, metas and meta_attrs)
+            domain, attrs and X, classes and Y, meta_attrs and metas)
 
 
 @FileFormats.register("Excel file", ".xlsx")
@@ -650,9 +991,93 @@ class ExcelFormat:
 class PickleFormat:
     @classmethod
     def read_file(cls, file, _=None):
-        return pickle.load(open(file, "rb"))
+        with open_compressed(file, "rb") as f:
+            return pickle.load(f)
 
     @classmethod
     def write_file(cls, filename, table):
-        pickle.dump(table, open(filename, "wb"))
+        with open_compressed(filename, "wb") as f:
+            pickle.dump(table, f)
+
 
+@FileFormats.register("Memory-mapped table", ".mmt")
+class MemmapFormat:
+    """
+    Binary format in which X, Y and weights are stored as raw blocks of
+    float64 values that are opened with `np.memmap`. Opening a table does
+    not read the data, and processes that open the same file share its pages.
+
+    The file starts with `MAGIC` and the length of the pickled header, which
+    contains the domain, meta attributes and the shapes and offsets of the
+    blocks. Offsets are aligned to `ALIGNMENT` and relative to the first
+    aligned position after the header.
+    """
+    MAGIC = b"ORANGE-MMT\x01"
+    ALIGNMENT = 4096
+
+    @classmethod
+    def _aligned(cls, pos):
+        return -(-pos // cls.ALIGNMENT) * cls.ALIGNMENT
+
+    @staticmethod
+    def _check_not_compressed(filename):
+        if split_compression(filename)[1]:
+            raise ValueError("Memory-mapped tables cannot be compressed")
+
+    @classmethod
+    def read_file(cls, filename, storage_class=None):
+        if storage_class is None:
+            from ..data import Table as storage_class
+        cls._check_not_compressed(filename)
+        with open(filename, "rb") as f:
+            if f.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError(
+                    "'{}' is not a memory-mapped table".format(filename))
+            header_len, = struct.unpack("<Q", f.read(8))
+            header = pickle.loads(f.read(header_len))
+        data_start = cls._aligned(len(cls.MAGIC) + 8 + header_len)
+
+        def block(name):
+            shape, offset = header["blocks"][name]
+            if not np.prod(shape):
+                return np.empty(shape)
+            # copy-on-write: pages are shared until (and unless) modified
+            return np.memmap(filename, dtype=np.float64, mode="c",
+                             offset=data_start + offset, shape=shape)
+
+        has_weights = "W" in header["blocks"]
+        table = storage_class.from_domain(header["domain"], 0, has_weights)
+        table.X = block("X")
+        table._Y = block("Y")
+        table.metas = header["metas"]
+        table.W = block("W") if has_weights \
+            else np.empty((header["n_rows"], 0))
+        table.n_rows = header["n_rows"]
+        storage_class._init_ids(table)
+        return table
+
+    @classmethod
+    def write_file(cls, filename, data):
+        cls._check_not_compressed(filename)
+        if not data._check_all_dense():
+            raise ValueError(
+                "Sparse data cannot be saved as a memory-mapped table")
+        arrays = [("X", data.X), ("Y", data._Y)]
+        if data.has_weights():
+            arrays.append(("W", data.W))
+        blocks = {}
+        offset = 0
+        for name, arr in arrays:
+            blocks[name] = (arr.shape, offset)
+            offset = cls._aligned(offset + arr.size * 8)
+        header = pickle.dumps(dict(domain=data.domain, metas=data.metas,
+                                   n_rows=len(data), blocks=blocks),
+                              protocol=pickle.HIGHEST_PROTOCOL)
+        with open(filename, "wb") as f:
+            f.write(cls.MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            data_start = cls._aligned(f.tell())
+            for name, arr in arrays:
+                f.write(b"\0" * (data_start + blocks[name][1] - f.tell()))
+                np.ascontiguousarray(arr, dtype=np.float64).tofile(f)
@@ -0,0 +1,164 @@
+import sys
+
+import numpy as np
+from scipy import sparse as sp
+
+from Orange.data.table import Table
+
+__all__ = ["SharedTable", "share_table"]
+
+
+class _Segment:
+    """
+    Exposes a block of shared memory to numpy as a read-only array.
+
+    Arrays created from the segment have it as their base, and views of
+    these arrays refer to it through their bases; the block is thus kept
+    open for as long as any array uses it.
+    """
+    def __init__(self, block, shape, dtype):
+        self.block = block
+        data = np.ndarray(shape, dtype, block.buf)
+        self.__array_interface__ = dict(
+            shape=data.shape, typestr=data.dtype.str, version=3,
+            data=(data.__array_interface__["data"][0], True))
+
+
+def _require_shared_memory():
+    if sys.version_info < (3, 8):
+        raise RuntimeError("Sharing tables requires Python 3.8 or newer")
+
+
+class SharedTable:
+    """
+    A handle to a table whose arrays are published in shared memory.
+
+    The handle is small and cheap to pickle, so it can be passed to worker
+    processes instead of the table. :obj:`attach` reconstructs a read-only
+    table whose `X`, `Y`, `W` and `ids` are views into the shared memory and
+    are therefore not copied. Object and sparse arrays, like meta attributes,
+    are pickled with the handle.
+
+    The process that created the handle owns the shared memory and must
+    release it with :obj:`unlink` (or by using the handle as a context
+    manager) when workers are done with it. Sharing requires Python 3.8 or
+    newer.
+
+    .. attribute:: arrays
+
+        A dictionary whose keys are names of table's arrays (`"X"`, `"_Y"`,
+        `"metas"`, `"W"` and `"ids"`) and values are either tuples with the
+        name of the shared memory block, shape and dtype of the array, or
+        arrays that are pickled with the handle.
+    """
+    def __init__(self, domain, arrays, name=None, attributes=None):
+        self.domain = domain
+        self.arrays = arrays
+        self.name = name
+        self.attributes = attributes
+        self._blocks = []
+
+    @classmethod
+    def from_table(cls, table):
+        """
+        Publish table's arrays in shared memory and return a handle.
+
+        :param table: the table to share
+        :type table: Orange.data.Table
+        :rtype: SharedTable
+        """
+        _require_shared_memory()
+        from multiprocessing.shared_memory import SharedMemory
+
+        arrays = {}
+        blocks = []
+        try:
+            for part in ("X", "_Y", "W", "ids", "metas"):
+                array = getattr(table, part)
+                if sp.issparse(array) or array.dtype == object:
+                    arrays[part] = array
+                    continue
+                block = SharedMemory(create=True, size=max(array.nbytes, 1))
+                blocks.append(block)
+                np.ndarray(array.shape, array.dtype, block.buf)[...] = array
+                arrays[part] = (block.name, array.shape, array.dtype.str)
+        except Exception:
+            for block in blocks:
+                block.close()
+                block.unlink()
+            raise
+        self = cls(table.domain, arrays,
+                   getattr(table, "name", None),
+                   getattr(table, "attributes", None))
+        self._blocks = blocks
+        return self
+
+    def attach(self):
+        """
+        Return a read-only table with arrays in the shared memory.
+
+        The shared memory stays open for as long as the table's arrays or
+        any of their views exist. Since the table does not own the data, it
+        cannot be extended; use :obj:`Orange.data.Table.ensure_copy` to get
+        a writable copy.
+
+        :rtype: Orange.data.Table
+        """
+        _require_shared_memory()
+        from multiprocessing.shared_memory import SharedMemory
+
+        parts = {}
+        for part, desc in self.arrays.items():
+            if isinstance(desc, tuple):
+                name, shape, dtype = desc
+                segment = _Segment(SharedMemory(name=name), shape,
+                                   np.dtype(dtype))
+                parts[part] = np.asarray(segment)
+            else:
+                parts[part] = desc
+
+        table = Table.__new__(Table)
+        table.domain = self.domain
+        table.X = parts["X"]
+        table._Y = parts["_Y"]
+        table.metas = parts["metas"]
+        table.W = parts["W"]
+        table.ids = parts["ids"]
+        table.n_rows = table.X.shape[0]
+        if self.name is not None:
+            table.name = self.name
+        if self.attributes is not None:
+            table.attributes = self.attributes
+        return table
+
+    def unlink(self):
+        """
+        Release the shared memory. Tables that are already attached keep
+        their data, but new ones can no longer be attached.
+        """
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_blocks"] = []
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.unlink()
+
+
+def share_table(table):
+    """
+    Publish table's arrays in shared memory; see :obj:`SharedTable`.
+
+    :param table: the table to share
+    :type table: Orange.data.Table
+    :rtype: SharedTable
+    """
+    return SharedTable.from_table(table)
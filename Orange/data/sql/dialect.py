@@ -0,0 +1,229 @@
+"""
+Parts of SQL and connection handling that differ between database systems.
+"""
+import itertools
+import math
+import sqlite3
+import threading
+
+import Orange.misc
+psycopg2 = Orange.misc.import_late_warning("psycopg2")
+psycopg2.pool = Orange.misc.import_late_warning("psycopg2.pool")
+
+__all__ = ["Dialect", "PostgresDialect", "SqliteDialect"]
+
+
+class Dialect:
+    """
+    The base class for dialects, which tell :obj:`SqlTable` how to connect
+    to a database, how to determine types of columns and how to write the
+    expressions that are not standard SQL.
+
+    Type codes of columns, as returned by :obj:`column_types`, are sorted
+    into `FLOATISH_TYPES`, `INT_TYPES`, `CHAR_TYPES` and `BOOLEAN_TYPES`.
+
+    .. attribute:: supports_sampling
+
+        Tells whether the database can sample tables; if not, statistics
+        of large tables are computed from all rows.
+
+    .. attribute:: estimates_rows
+
+        Tells whether the database can estimate the number of rows with
+        `EXPLAIN`; if not, `approx_len` counts them.
+    """
+    FLOATISH_TYPES = ()
+    INT_TYPES = ()
+    CHAR_TYPES = ()
+    BOOLEAN_TYPES = ()
+
+    DISCRETE_STATS = "SUM(CASE TRUE WHEN %(field_name)s IS NULL THEN 1 " \
+                     "ELSE 0 END), " \
+                     "SUM(CASE TRUE WHEN %(field_name)s IS NULL THEN 0 " \
+                     "ELSE 1 END)"
+    CONTINUOUS_STATS = None
+
+    supports_sampling = False
+    estimates_rows = False
+
+    # the exception raised when a query refers to a missing table
+    ProgrammingError = Exception
+
+    def create_connection_pool(self, connection_params):
+        """
+        Return a pool with methods `getconn`, `putconn` and `closeall`.
+        """
+        raise NotImplementedError
+
+    def cursor(self, connection, server_side=False):
+        """
+        Return a cursor; if `server_side` is set, the cursor should fetch
+        the results from the database as the rows are requested.
+        """
+        return connection.cursor()
+
+    def column_types(self, sql_table):
+        """Return a list of names and type codes of the table's columns."""
+        query = "SELECT * FROM %s LIMIT 0" % sql_table.table_name
+        with sql_table._execute_sql_query(query) as cur:
+            return [col[:2] for col in cur.description]
+
+    def cast_float(self, field):
+        return "CAST(%s AS double precision)" % field
+
+    def cast_text(self, field):
+        return "CAST(%s AS text)" % field
+
+    def limit(self, limit=None, offset=None):
+        """Return the clause that limits the number of rows."""
+        sql = []
+        if limit is not None:
+            sql.extend(["LIMIT", str(limit)])
+        if offset is not None:
+            sql.extend(["OFFSET", str(offset)])
+        return " ".join(sql)
+
+
+class PostgresDialect(Dialect):
+    """A dialect for PostgreSQL databases, which uses psycopg2."""
+    FLOATISH_TYPES = (700, 701, 1700)  # real, float8, numeric
+    INT_TYPES = (20, 21, 23)  # bigint, int, smallint
+    CHAR_TYPES = (25, 1042, 1043,)  # text, char, varchar
+    BOOLEAN_TYPES = (16,)  # bool
+
+    CONTINUOUS_STATS = "MIN(%(field_name)s)::double precision, " \
+                       "MAX(%(field_name)s)::double precision, " \
+                       "AVG(%(field_name)s)::double precision, " \
+                       "STDDEV(%(field_name)s)::double precision, " \
+                       + Dialect.DISCRETE_STATS
+
+    supports_sampling = True
+    estimates_rows = True
+
+    _cursor_ids = itertools.count()
+
+    @property
+    def ProgrammingError(self):
+        return psycopg2.ProgrammingError
+
+    def create_connection_pool(self, connection_params):
+        return psycopg2.pool.ThreadedConnectionPool(
+            1, 16, **connection_params)
+
+    def cursor(self, connection, server_side=False):
+        if server_side:
+            return connection.cursor(
+                "orange_cursor_%i" % next(self._cursor_ids))
+        return connection.cursor()
+
+    def cast_float(self, field):
+        return "({})::double precision".format(field)
+
+    def cast_text(self, field):
+        return "({})::text".format(field)
+
+
+class SqliteDialect(Dialect):
+    """
+    A dialect for SQLite databases. Connection parameters are those of
+    :obj:`sqlite3.connect`; `database` is the name of the file.
+
+    Columns are typed by the values they hold, so type codes are the names
+    of storage classes of the first defined value in each column.
+    """
+    FLOATISH_TYPES = ("real",)
+    INT_TYPES = ("integer",)
+    CHAR_TYPES = ("text",)
+
+    CONTINUOUS_STATS = "CAST(MIN(%(field_name)s) AS REAL), " \
+                       "CAST(MAX(%(field_name)s) AS REAL), " \
+                       "CAST(AVG(%(field_name)s) AS REAL), " \
+                       "STDDEV(%(field_name)s), " \
+                       + Dialect.DISCRETE_STATS
+
+    ProgrammingError = sqlite3.OperationalError
+
+    def create_connection_pool(self, connection_params):
+        return SqliteConnectionPool(**connection_params)
+
+    def column_types(self, sql_table):
+        names = [name for name, _ in super().column_types(sql_table)]
+        if not names:
+            return []
+        fields = [sql_table.quote_identifier(name) for name in names]
+        query = "SELECT " + ", ".join(
+            "(SELECT typeof({0}) FROM {1} WHERE {0} IS NOT NULL LIMIT 1)"
+            .format(field, sql_table.table_name) for field in fields)
+        with sql_table._execute_sql_query(query) as cur:
+            types = cur.fetchone()
+        return list(zip(names, types))
+
+    def cast_float(self, field):
+        return "CAST(%s AS REAL)" % field
+
+    def cast_text(self, field):
+        return "CAST(%s AS TEXT)" % field
+
+    def limit(self, limit=None, offset=None):
+        # SQLite does not allow OFFSET without LIMIT
+        if limit is None and offset is not None:
+            limit = -1
+        return super().limit(limit, offset)
+
+
+class StdDev:
+    """An SQLite aggregate for the sample standard deviation."""
+    def __init__(self):
+        self.n = 0
+        self.mean = self.m2 = 0.
+
+    def step(self, value):
+        if value is None:
+            return
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+
+    def finalize(self):
+        if self.n < 2:
+            return None
+        return math.sqrt(self.m2 / (self.n - 1))
+
+
+class SqliteConnectionPool:
+    """
+    A pool of connections to an SQLite database, with the interface of
+    psycopg2's pools. Connections may be used from any thread, but by one
+    thread at a time.
+    """
+    def __init__(self, database, **kwargs):
+        self.database = database
+        self.kwargs = kwargs
+        self._idle = []
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def getconn(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        connection = sqlite3.connect(
+            self.database, check_same_thread=False, **self.kwargs)
+        connection.create_aggregate("STDDEV", 1, StdDev)
+        # string filters lower the case themselves when they should ignore it
+        connection.execute("PRAGMA case_sensitive_like = ON")
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def putconn(self, connection):
+        with self._lock:
+            self._idle.append(connection)
+
+    def closeall(self):
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
+            self._idle = []
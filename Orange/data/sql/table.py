@@ -1,27 +1,41 @@
 """
-Support for example tables wrapping data stored on a PostgreSQL server.
+Support for example tables wrapping data stored on a PostgreSQL server or
+in an SQLite database.
 """
-import functools
+import itertools
 import re
 import threading
+import zlib
 from contextlib import contextmanager
 
 import numpy as np
 
-import Orange.misc
-psycopg2 = Orange.misc.import_late_warning("psycopg2")
-psycopg2.pool = Orange.misc.import_late_warning("psycopg2.pool")
-
 from .. import domain, variable, value, table, instance, filter,\
     DiscreteVariable, ContinuousVariable, StringVariable
 from Orange.data.sql import filter as sql_filter
+from Orange.data.sql.dialect import PostgresDialect, SqliteDialect
+from Orange.misc.cache import LRUCache
 
 LARGE_TABLE = 100000
 DEFAULT_SAMPLE_TIME = 1
 
 
+_QUOTED = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+
+
+def normalize_query(query):
+    """Collapse whitespace outside quoted literals and identifiers."""
+    parts = _QUOTED.split(query)
+    parts[::2] = [re.sub(r"\s+", " ", part) for part in parts[::2]]
+    return "".join(parts).strip()
+
+
 class SqlTable(table.Table):
+    dialect = PostgresDialect()
     connection_pool = None
+    # results of aggregate queries, keyed by connection parameters and the
+    # normalized text of the query, which includes table's row filters
+    query_cache = LRUCache(maxsize=256, ttl=300)
     table_name = None
     domain = None
     row_filters = ()
@@ -82,31 +96,27 @@ class SqlTable(table.Table):
             self.name = table
 
     def create_connection_pool(self):
-        self.connection_pool = psycopg2.pool.ThreadedConnectionPool(
-            1, 16, **self.connection_params)
+        self.connection_pool = self.dialect.create_connection_pool(
+            self.connection_params)
 
     def get_domain(self, type_hints=None, guess_values=False):
         if type_hints is None:
             type_hints = domain.Domain([])
 
-        fields = []
-        query = "SELECT * FROM %s LIMIT 0" % self.table_name
-        with self._execute_sql_query(query) as cur:
-            for col in cur.description:
-                fields.append(col)
+        fields = self.dialect.column_types(self)
 
         def add_to_sql(var, field_name):
             if isinstance(var, ContinuousVariable):
-                var.to_sql = ToSql("({})::double precision".format(
+                var.to_sql = ToSql(self.dialect.cast_float(
                     self.quote_identifier(field_name)))
             elif isinstance(var, DiscreteVariable):
-                var.to_sql = ToSql("({})::text".format(
+                var.to_sql = ToSql(self.dialect.cast_text(
                     self.quote_identifier(field_name)))
             else:
                 var.to_sql = ToSql(self.quote_identifier(field_name))
 
         attrs, class_vars, metas = [], [], []
-        for field_name, type_code, *rest in fields:
+        for field_name, type_code in fields:
             if field_name in type_hints:
                 var = type_hints[field_name]
             else:
@@ -126,25 +136,21 @@ class SqlTable(table.Table):
         return domain.Domain(attrs, class_vars, metas)
 
     def get_variable(self, field_name, type_code, inspect_values=False):
-        FLOATISH_TYPES = (700, 701, 1700)  # real, float8, numeric
-        INT_TYPES = (20, 21, 23)  # bigint, int, smallint
-        CHAR_TYPES = (25, 1042, 1043,)  # text, char, varchar
-        BOOLEAN_TYPES = (16,)  # bool
-
-        if type_code in FLOATISH_TYPES:
+        dialect = self.dialect
+        if type_code in dialect.FLOATISH_TYPES:
             return ContinuousVariable(field_name)
 
-        if type_code in INT_TYPES:  # bigint, int, smallint
+        if type_code in dialect.INT_TYPES:
             if inspect_values:
                 values = self.get_distinct_values(field_name)
                 if values:
                     return DiscreteVariable(field_name, values)
             return ContinuousVariable(field_name)
 
-        if type_code in BOOLEAN_TYPES:
+        if type_code in dialect.BOOLEAN_TYPES:
             return DiscreteVariable(field_name, ['false', 'true'])
 
-        if type_code in CHAR_TYPES:
+        if type_code in dialect.CHAR_TYPES:
             if inspect_values:
                 values = self.get_distinct_values(field_name)
                 if values:
@@ -153,8 +159,9 @@ class SqlTable(table.Table):
         return StringVariable(field_name)
 
     def get_distinct_values(self, field_name):
-        sql = " ".join(["SELECT DISTINCT (%s)::text" %
-                            self.quote_identifier(field_name),
+        sql = " ".join(["SELECT DISTINCT",
+                        self.dialect.cast_text(
+                            self.quote_identifier(field_name)),
                         "FROM", self.table_name,
                         "WHERE {} IS NOT NULL".format(
                             self.quote_identifier(field_name)),
@@ -191,11 +198,7 @@ class SqlTable(table.Table):
         if isinstance(row_idx, int):
             try:
                 col_idx = self.domain.index(col_idx)
-                var = self.domain[col_idx]
-                return value.Value(
-                    var,
-                    self._query(self.table_name, var, rows=[row_idx])
-                )
+                return self._fetch_row(row_idx)[col_idx]
             except TypeError:
                 pass
 
@@ -215,12 +218,25 @@ class SqlTable(table.Table):
         # table.limit_rows(row_idx)
         return table
 
-    @functools.lru_cache(maxsize=128)
+    # Rows are fetched in blocks of ROW_BLOCK_SIZE rows, so that accessing
+    # nearby rows (e.g. scrolling through a view) does not make a round trip
+    # for each row; the cache keeps ROW_CACHE_SIZE most recently used blocks
+    ROW_BLOCK_SIZE = 100
+    ROW_CACHE_SIZE = 64
+    row_cache = LRUCache(ROW_CACHE_SIZE)
+
     def _fetch_row(self, row_index):
-        attributes = self.domain.variables + self.domain.metas
-        rows = [row_index]
-        values = list(self._query(attributes, rows=rows))[0]
-        return SqlRowInstance(self.domain, values)
+        block, offset = divmod(row_index, self.ROW_BLOCK_SIZE)
+        rows = self.row_cache.get((self, self.domain), block)
+        if rows is None:
+            start = block * self.ROW_BLOCK_SIZE
+            attributes = self.domain.variables + self.domain.metas
+            rows = list(self._query(
+                attributes, rows=slice(start, start + self.ROW_BLOCK_SIZE)))
+            self.row_cache.set((self, self.domain), rows, block)
+        if offset >= len(rows):
+            raise IndexError("Index out of range")
+        return SqlRowInstance(self.domain, rows[offset])
 
     def __iter__(self):
         """ Iterating through the rows executes the query using a cursor and
@@ -231,18 +247,27 @@ class SqlTable(table.Table):
         for row in self._query(attributes):
             yield SqlRowInstance(self.domain, row)
 
+    @staticmethod
+    def _sql_fields(attributes):
+        if attributes is None:
+            return ["*"]
+        fields = []
+        for attr in attributes:
+            assert hasattr(attr, 'to_sql'), \
+                "Cannot use ordinary attributes with sql backend"
+            field_str = '(%s) AS "%s"' % (attr.to_sql(), attr.name)
+            fields.append(field_str)
+        if not fields:
+            raise ValueError("No fields selected.")
+        return fields
+
     def _query(self, attributes=None, filters=(), rows=None):
-        if attributes is not None:
-            fields = []
-            for attr in attributes:
-                assert hasattr(attr, 'to_sql'), \
-                    "Cannot use ordinary attributes with sql backend"
-                field_str = '(%s) AS "%s"' % (attr.to_sql(), attr.name)
-                fields.append(field_str)
-            if not fields:
-                raise ValueError("No fields selected.")
-        else:
-            fields = ["*"]
+        """
+        Yield rows with values of the given attributes. Rows can be selected
+        by a slice or by a sequence of indices; in the latter case, rows are
+        yielded in the given order and indices of missing rows are skipped.
+        """
+        fields = self._sql_fields(attributes)
 
         filters = [f.to_sql() for f in filters]
 
@@ -253,11 +278,14 @@ class SqlTable(table.Table):
                 if rows.stop is not None:
                     limit = rows.stop - offset
             else:
-                rows = list(rows)
-                offset, stop = min(rows), max(rows)
-                limit = stop - offset + 1
+                rows = [int(row) for row in rows]
+                if not rows:
+                    return
+                if rows != list(range(rows[0], rows[0] + len(rows))):
+                    yield from self._query_rows(fields, filters, rows)
+                    return
+                offset, limit = rows[0], len(rows)
 
-        # TODO: this returns all rows between min(rows) and max(rows): fix!
         query = self._sql_query(fields, filters, offset=offset, limit=limit)
         with self._execute_sql_query(query) as cur:
             while True:
@@ -266,15 +294,40 @@ class SqlTable(table.Table):
                     break
                 yield row
 
+    def _query_rows(self, fields, filters, rows):
+        # Rows are numbered in a subquery and selected by their numbers;
+        # the number is the last column of the subquery, so `*` selects the
+        # requested fields followed by the number, also when the fields are
+        # `*` themselves. Rows are numbered in the order in which they are
+        # scanned, without ORDER BY, because row indices must match those
+        # used by OFFSET in slices and by iteration, which are unordered as
+        # well: tables given as queries have neither a primary key nor a
+        # ctid, and ordering by all columns would sort the whole table.
+        # The subquery is limited to the last requested row, so the rest of
+        # the table is not scanned and numbered.
+        numbered = self._sql_query(
+            list(fields) + ["row_number() OVER () - 1 AS __orange_row"],
+            filters, limit=max(rows) + 1)
+        query = " ".join([
+            "SELECT * FROM (%s) AS __orange_rows" % numbered,
+            "WHERE __orange_row IN (%s)" % ", ".join(
+                map(str, sorted(set(rows))))])
+        with self._execute_sql_query(query) as cur:
+            fetched = {row[-1]: row[:-1] for row in cur.fetchall()}
+        for row in rows:
+            if row in fetched:
+                yield fetched[row]
+
     def copy(self):
         """Return a copy of the SqlTable"""
-        table = SqlTable.__new__(SqlTable)
+        table = type(self).__new__(type(self))
         table.connection_pool = self.connection_pool
         table.domain = self.domain
         table.row_filters = self.row_filters
         table.table_name = self.table_name
         table.name = self.name
         table.connection_params = self.connection_params
+        table.query_cache = self.query_cache
         return table
 
     def __bool__(self):
@@ -296,16 +349,16 @@ class SqlTable(table.Table):
 
     def _count_rows(self):
         query = self._sql_query(["COUNT(*)"])
-        with self._execute_sql_query(query) as cur:
-            self._cached__len__ = cur.fetchone()[0]
+        self._cached__len__ = self._cached_fetchall(query)[0][0]
         return self._cached__len__
 
     def approx_len(self, get_exact=False):
         if self._cached__len__ is not None:
             return self._cached__len__
+        if not self.dialect.estimates_rows:
+            return len(self)
         sql = "EXPLAIN " + self._sql_query(["*"])
-        with self._execute_sql_query(sql) as cur:
-            s = ''.join(row[0] for row in cur.fetchall())
+        s = ''.join(row[0] for row in self._cached_fetchall(sql))
         alen = int(re.findall('rows=(\d*)', s)[0])
         if get_exact:
             threading.Thread(target=len, args=(self,)).start()
@@ -314,13 +367,61 @@ class SqlTable(table.Table):
     _X = None
     _Y = None
 
+    _metas = None
+
+    # the number of rows that download_data fetches in one round trip
+    DOWNLOAD_BATCH_SIZE = 10000
+
     def download_data(self, limit=None):
-        """Download SQL data and store it in memory as numpy matrices."""
-        if limit and len(self) > limit: #TODO: faster check for size limit
+        """
+        Download SQL data and store it in memory as numpy matrices.
+
+        Rows are fetched through a server-side cursor in batches of
+        `DOWNLOAD_BATCH_SIZE` rows and decoded column by column into
+        preallocated arrays. If the table has more than `limit` rows,
+        `ValueError` is raised; the rows are not counted in advance,
+        instead, at most `limit + 1` rows are fetched.
+        """
+        domain = self.domain
+        n_attrs = len(domain.attributes)
+        n_vars = len(domain.variables)
+        capacity = self._cached__len__ or self.DOWNLOAD_BATCH_SIZE
+        if limit:
+            capacity = min(capacity, limit + 1)
+        X = np.empty((capacity, n_attrs))
+        Y = np.empty((capacity, len(domain.class_vars)))
+        metas = np.empty((capacity, len(domain.metas)), dtype=object)
+        n_rows = 0
+        query = self._sql_query(
+            self._sql_fields(domain.variables + domain.metas),
+            limit=limit + 1 if limit else None)
+        with self._execute_sql_query(query, server_side=True) as cur:
+            while True:
+                rows = cur.fetchmany(self.DOWNLOAD_BATCH_SIZE)
+                if not rows:
+                    break
+                end = n_rows + len(rows)
+                if end > len(X):
+                    capacity = max(end, 2 * len(X))
+                    X, Y, metas = (np.resize(a, (capacity, a.shape[1]))
+                                   for a in (X, Y, metas))
+                columns = list(zip(*rows))
+                for i, var in enumerate(domain.variables):
+                    values = table._values_to_floats(var, columns[i])
+                    if i < n_attrs:
+                        X[n_rows:end, i] = values
+                    else:
+                        Y[n_rows:end, i - n_attrs] = values
+                for i, var in enumerate(domain.metas):
+                    values = columns[n_vars + i]
+                    if var.is_primitive():
+                        values = table._values_to_floats(var, values)
+                    metas[n_rows:end, i] = values
+                n_rows = end
+        if limit and n_rows > limit:
             raise ValueError("Too many rows to download the data into memory.")
-        self._X = np.vstack(row._x for row in self)
-        self._Y = np.vstack(row._y for row in self)
-        self._cached__len__ = self._X.shape[0]
+        self._X, self._Y, self._metas = X[:n_rows], Y[:n_rows], metas[:n_rows]
+        self._cached__len__ = n_rows
 
     @property
     def X(self):
@@ -336,12 +437,20 @@ class SqlTable(table.Table):
             self.download_data(1000)
         return self._Y
 
+    @property
+    def metas(self):
+        """Numpy array with meta attribute values."""
+        if self._metas is None:
+            self.download_data(1000)
+        return self._metas
+
     def has_weights(self):
         return False
 
     def _compute_basic_stats(self, columns=None,
                              include_metas=False, compute_var=False):
-        if self.approx_len() > LARGE_TABLE:
+        if self.dialect.supports_sampling and \
+                self.approx_len() > LARGE_TABLE:
             self = self.sample_time(DEFAULT_SAMPLE_TIME)
 
         if columns is not None:
@@ -357,11 +466,11 @@ class SqlTable(table.Table):
                    for c in columns]
         sql_fields = []
         for field_name, continuous in columns:
-            stats = self.CONTINUOUS_STATS if continuous else self.DISCRETE_STATS
+            stats = self.dialect.CONTINUOUS_STATS if continuous \
+                else self.dialect.DISCRETE_STATS
             sql_fields.append(stats % dict(field_name=field_name))
         query = self._sql_query(sql_fields)
-        with self._execute_sql_query(query) as cur:
-            results = cur.fetchone()
+        results = self._cached_fetchall(query)[0]
         stats = []
         i = 0
         for ci, (field_name, continuous) in enumerate(columns):
@@ -374,7 +483,8 @@ class SqlTable(table.Table):
         return stats
 
     def _compute_distributions(self, columns=None):
-        if self.approx_len() > LARGE_TABLE:
+        if self.dialect.supports_sampling and \
+                self.approx_len() > LARGE_TABLE:
             self = self.sample_time(DEFAULT_SAMPLE_TIME)
 
         if columns is not None:
@@ -384,33 +494,67 @@ class SqlTable(table.Table):
         return self._get_distributions(columns)
 
     def _get_distributions(self, columns):
-        dists = []
-        for col in columns:
-            field_name = col.to_sql()
-            fields = field_name, "COUNT(%s)" % field_name
-            query = self._sql_query(fields,
-                                    filters=['%s IS NOT NULL' % field_name],
-                                    group_by=[field_name],
-                                    order_by=[field_name])
-            with self._execute_sql_query(query) as cur:
-                dist = np.array(cur.fetchall())
+        dists = [None] * len(columns)
+        for i, rows in self._grouped_counts(columns):
+            col = columns[i]
+            defined = [(value, count) for value, count in rows
+                       if value is not None]
+            unknowns = sum(count for value, count in rows if value is None)
             if isinstance(col, ContinuousVariable):
-                dists.append((dist.T, []))
+                dist = np.array(defined, dtype=float).reshape(-1, 2).T
+            elif isinstance(col, DiscreteVariable):
+                dist = np.zeros(len(col.values))
+                for value, count in defined:
+                    dist[col.to_val(value)] += count
             else:
-                dists.append((dist[:, 1].T, []))
+                dist = np.array([count for _, count in defined])
+            dists[i] = (dist, unknowns)
         return dists
 
+    def _grouped_counts(self, columns, group_by=(), filters=()):
+        """
+        Count rows with each value of each column, split by values of
+        `group_by` fields; yield a tuple with the index of the column and
+        a list of rows with the column's value, values of `group_by` and
+        the count, ordered by values.
+
+        Each column is counted by a GROUP BY query; queries for columns of
+        the same type are combined with UNION ALL, so all columns take at
+        most one round trip for each type of columns.
+        """
+        by_type = {}
+        for i, col in enumerate(columns):
+            by_type.setdefault(type(col), []).append(i)
+        n_fields = len(group_by) + 3
+        for indices in by_type.values():
+            queries = []
+            for i in indices:
+                field = columns[i].to_sql()
+                queries.append(self._sql_query(
+                    [str(i), field] + list(group_by) + ["COUNT(*)"],
+                    filters=filters,
+                    group_by=[field] + list(group_by)))
+            query = " UNION ALL ".join(queries) + " ORDER BY " + \
+                ", ".join(str(k) for k in range(1, n_fields))
+            rows = self._cached_fetchall(query)
+            for i, col_rows in itertools.groupby(rows, lambda row: row[0]):
+                yield i, [row[1:] for row in col_rows]
+            yielded = {row[0] for row in rows}
+            for i in indices:
+                if i not in yielded:
+                    yield i, []
+
     def _compute_contingency(self, col_vars=None, row_var=None):
-        if self.approx_len() > LARGE_TABLE:
+        if self.dialect.supports_sampling and \
+                self.approx_len() > LARGE_TABLE:
             self = self.sample_time(DEFAULT_SAMPLE_TIME)
 
         if col_vars is None:
             col_vars = range(len(self.domain.variables))
-        if len(col_vars) != 1:
-            raise NotImplementedError("Contingency for multiple columns "
-                                      "has not yet been implemented.")
         if row_var is None:
-            raise NotImplementedError("Defaults have not been implemented yet")
+            row_var = self.domain.class_var
+            if row_var is None:
+                raise ValueError("No row variable")
 
         row = self.domain[row_var]
         if not isinstance(row, DiscreteVariable):
@@ -424,25 +568,25 @@ class SqlTable(table.Table):
                              "and continuous values")
 
         row_field = row.to_sql()
-
         all_contingencies = [None] * len(columns)
-        for i, column in enumerate(columns):
-            column_field = column.to_sql()
-            fields = [row_field, column_field, "COUNT(%s)" % column_field]
-            group_by = [row_field, column_field]
-            order_by = [column_field]
-            filters = ['%s IS NOT NULL' % f
-                       for f in (row_field, column_field)]
-            query = self._sql_query(fields, filters=filters,
-                                    group_by=group_by, order_by=order_by)
-            with self._execute_sql_query(query) as cur:
-                data = list(cur.fetchall())
-                if isinstance(column, ContinuousVariable):
-                    all_contingencies[i] = \
-                        (self._continuous_contingencies(data, row), [])
-                else:
-                    all_contingencies[i] =\
-                        (self._discrete_contingencies(data, row, column), [])
+        for i, rows in self._grouped_counts(
+                columns, group_by=[row_field],
+                filters=['%s IS NOT NULL' % row_field]):
+            column = columns[i]
+            data = [(row_value, column_value, count)
+                    for column_value, row_value, count in rows
+                    if column_value is not None]
+            unknowns = np.zeros(len(row.values))
+            for column_value, row_value, count in rows:
+                if column_value is None:
+                    unknowns[row.to_val(row_value)] += count
+            if isinstance(column, ContinuousVariable):
+                all_contingencies[i] = \
+                    (self._continuous_contingencies(data, row), unknowns)
+            else:
+                all_contingencies[i] = \
+                    (self._discrete_contingencies(data, row, column),
+                     unknowns)
         return all_contingencies
 
     def _continuous_contingencies(self, data, row):
@@ -458,7 +602,7 @@ class SqlTable(table.Table):
                 last = column_value
                 values[i] = column_value
                 counts[row.to_val(row_value), i] += count
-        return (values, counts)
+        return (values[:i + 1], counts[:, :i + 1])
 
     def _discrete_contingencies(self, data, row, column):
         conts = np.zeros((len(row.values), len(column.values)))
@@ -569,22 +713,10 @@ class SqlTable(table.Table):
             sql.extend(["GROUP BY", ", ".join(group_by)])
         if order_by is not None:
             sql.extend(["ORDER BY", ",".join(order_by)])
-        if offset is not None:
-            sql.extend(["OFFSET", str(offset)])
-        if limit is not None:
-            sql.extend(["LIMIT", str(limit)])
+        if limit is not None or offset is not None:
+            sql.append(self.dialect.limit(limit, offset))
         return " ".join(sql)
 
-    DISCRETE_STATS = "SUM(CASE TRUE WHEN %(field_name)s IS NULL THEN 1 " \
-                     "ELSE 0 END), " \
-                     "SUM(CASE TRUE WHEN %(field_name)s IS NULL THEN 0 " \
-                     "ELSE 1 END)"
-    CONTINUOUS_STATS = "MIN(%(field_name)s)::double precision, " \
-                       "MAX(%(field_name)s)::double precision, " \
-                       "AVG(%(field_name)s)::double precision, " \
-                       "STDDEV(%(field_name)s)::double precision, " \
-                       + DISCRETE_STATS
-
     def quote_identifier(self, value):
         return '"%s"' % value
 
@@ -606,6 +738,9 @@ class SqlTable(table.Table):
                             no_cache=no_cache)
 
     def _sample(self, method, parameter, no_cache=False):
+        if not self.dialect.supports_sampling:
+            raise NotImplementedError(
+                "Sampling is not supported by the database")
         if "," in self.table_name:
             raise NotImplementedError("Sampling of complex queries is not supported")
 
@@ -623,7 +758,7 @@ class SqlTable(table.Table):
                     cur.fetchall()
                 create = True
 
-        except psycopg2.ProgrammingError:
+        except self.dialect.ProgrammingError:
             create = True
 
         if create:
@@ -636,25 +771,86 @@ class SqlTable(table.Table):
 
         sampled_table = self.copy()
         sampled_table.table_name = self.quote_identifier(sample_table)
+        if create:
+            # results cached for a previous sample table of the same name
+            sampled_table.invalidate_cache()
         return sampled_table
 
     @contextmanager
-    def _execute_sql_query(self, query, param=None):
+    def _execute_sql_query(self, query, param=None, server_side=False):
+        """
+        Execute the query and yield the cursor. If `server_side` is set,
+        the dialect provides a cursor that keeps the results in the database
+        and gets them as the rows are fetched.
+        """
         connection = self.connection_pool.getconn()
-        cur = connection.cursor()
+        cur = self.dialect.cursor(connection, server_side)
         try:
-            cur.execute(query, param)
+            if param is None:
+                cur.execute(query)
+            else:
+                cur.execute(query, param)
             yield cur
         finally:
             connection.commit()
             self.connection_pool.putconn(connection)
 
+    def _connection_key(self):
+        params = getattr(self, "connection_params", None) or {}
+        return tuple(sorted((key, str(value))
+                            for key, value in params.items()))
+
+    def _cached_fetchall(self, query):
+        """
+        Return all rows of the query's result, from the `query_cache` if it
+        is set and holds the result. Results are stored with the connection
+        and the table name, so :obj:`invalidate_cache` can find them.
+        """
+        cache = self.query_cache
+        if cache is None:
+            with self._execute_sql_query(query) as cur:
+                return cur.fetchall()
+        key = (self._connection_key(), normalize_query(self.table_name),
+               normalize_query(query))
+        rows = cache.get((), key)
+        if rows is None:
+            with self._execute_sql_query(query) as cur:
+                rows = cur.fetchall()
+            cache.set((), rows, key)
+        return rows
+
+    def invalidate_cache(self):
+        """
+        Remove cached results of queries on this table, which were
+        computed from the same connection; call it after the table is
+        changed on the server.
+        """
+        if self.query_cache is None:
+            return
+        table_key = (self._connection_key(), normalize_query(self.table_name))
+        self.query_cache.discard(lambda key: key[:2] == table_key)
+        self._cached__len__ = None
+
     def checksum(self, include_metas=True):
-        return np.nan
+        """
+        Return a checksum of the query that selects the table's data,
+        including row filters, and of the number of rows.
+
+        The data itself is not read, so changes on the server that keep the
+        number of rows are not detected.
+        """
+        fields = self.domain.variables
+        if include_metas:
+            fields += self.domain.metas
+        query = self._sql_query([field.to_sql() for field in fields])
+        key = repr((self._connection_key(), normalize_query(query)))
+        return zlib.adler32(str(len(self)).encode(),
+                            zlib.adler32(key.encode()))
 
     def __getstate__(self):
         state = dict(self.__dict__)
         state.pop('connection_pool')
+        state.pop('query_cache', None)
         return state
 
     def __setstate__(self, state):
@@ -662,11 +858,28 @@ class SqlTable(table.Table):
         self.create_connection_pool()
 
 
+class SqliteTable(SqlTable):
+    """
+    A table wrapping data in an SQLite database; see :obj:`SqlTable`.
+
+    Instead of connection parameters for psycopg2, it takes those for
+    :obj:`sqlite3.connect`, or the name of the database file. Filters and
+    statistics are computed in the database, so the table need not fit
+    into memory. SQLite cannot sample tables, so statistics of large tables
+    are computed from all rows.
+
+        table = SqliteTable('data.sqlite', 'table_name')
+    """
+    dialect = SqliteDialect()
+    connection_pool = None
+
+
 class SqlRowInstance(instance.Instance):
     """
     Extends :obj:`Orange.data.Instance` to correctly handle values of meta
     attributes.
     """
+    __slots__ = ()
 
     def __init__(self, domain, data=None):
         nvar = len(domain.variables)
@@ -1,12 +1,13 @@
 import os
+import weakref
 import zlib
 from collections import MutableSequence, Iterable, Sequence, Sized
 from itertools import chain
 from numbers import Real, Integral
-import operator
-from functools import reduce
 from warnings import warn
-from threading import Lock
+from functools import reduce
+from threading import Lock, local
+from concurrent.futures import ThreadPoolExecutor
 import tempfile
 import urllib.parse
 import urllib.request
@@ -18,6 +19,7 @@ from .instance import *
 from Orange.data import (domain as orange_domain,
                          io, DiscreteVariable, ContinuousVariable, Variable)
 from Orange.data.storage import Storage
+from Orange.misc.cache import LRUCache
 from . import _contingency
 from . import _valuecount
 
@@ -30,10 +32,8 @@ dataset_dirs = ['', get_sample_datasets_dir()]
 
 
 class RowInstance(Instance):
-    sparse_x = None
-    sparse_y = None
-    sparse_metas = None
-    _weight = None
+    __slots__ = ("table", "row_index", "id",
+                 "sparse_x", "sparse_y", "sparse_metas")
 
     def __init__(self, table, row_index):
         """
@@ -43,6 +43,7 @@ class RowInstance(Instance):
         self._domain = table.domain
         self.row_index = row_index
         self.id = table.ids[row_index]
+        self.sparse_x = self.sparse_y = self.sparse_metas = None
         self._x = table.X[row_index]
         if sp.issparse(self._x):
             self.sparse_x = self._x
@@ -56,6 +57,21 @@ class RowInstance(Instance):
             self.sparse_metas = self._metas
             self._metas = np.asarray(self._metas.todense())[0]
 
+    @classmethod
+    def _from_dense_row(cls, table, row_index, x, y, metas, id):
+        # A fast path for iteration over dense tables: the caller gives
+        # the rows of arrays, so they are not indexed or checked for sparsity
+        self = cls.__new__(cls)
+        self.table = table
+        self._domain = table.domain
+        self.row_index = row_index
+        self.id = id
+        self.sparse_x = self.sparse_y = self.sparse_metas = None
+        self._x = x
+        self._y = y
+        self._metas = metas
+        return self
+
     @property
     def weight(self):
         if not self.table.has_weights():
@@ -66,12 +82,14 @@ class RowInstance(Instance):
     def weight(self, weight):
         if not self.table.has_weights():
             self.table.set_weights()
+        self.table.mark_changed()
         self.table.W[self.row_index] = weight
 
     def set_class(self, value):
         self._check_single_class()
         if not isinstance(value, Real):
             value = self.table.domain.class_var.to_val(value)
+        self.table.mark_changed()
         self._y[0] = value
         if self.sparse_y:
             self.table._Y[self.row_index, 0] = value
@@ -82,6 +100,7 @@ class RowInstance(Instance):
         if isinstance(value, str):
             var = self._domain[key]
             value = var.to_val(value)
+        self.table.mark_changed()
         if key >= 0:
             if not isinstance(value, Real):
                 raise TypeError("Expected primitive value, got '%s'" %
@@ -226,10 +245,18 @@ class Table(MutableSequence, Storage):
         cls._init_ids(self)
         return self
 
-    conversion_cache = None
+    # Tables converted by from_table; conversions of the same source to the
+    # same domain are reused until the source changes or they are evicted
+    # to keep at most CONVERSION_CACHE_SIZE tables with CONVERSION_CACHE_BYTES
+    CONVERSION_CACHE_SIZE = 16
+    CONVERSION_CACHE_BYTES = 100 * 2 ** 20
+    conversion_cache = LRUCache(CONVERSION_CACHE_SIZE, CONVERSION_CACHE_BYTES,
+                                sizeof=lambda table: _nbytes(table))
+    # tells whether from_table is called from within another conversion
+    _conversion_state = local()
 
     @classmethod
-    def from_table(cls, domain, source, row_indices=...):
+    def from_table(cls, domain, source, row_indices=..., lazy=False):
         """
         Create a new table from selected columns and/or rows of an existing
         one. The columns are chosen using a domain. The domain may also include
@@ -238,15 +265,32 @@ class Table(MutableSequence, Storage):
 
         The resulting data may be a view or a copy of the existing data.
 
+        Conversions of all rows of a table are cached in `conversion_cache`
+        and reused until the source is changed (see :obj:`mark_changed`) or
+        its arrays are replaced. Conversions that are called while
+        converting the source, like those by `compute_value` of variables,
+        share the cached table, whose arrays are read-only; other callers
+        get a copy, which they may change.
+
+        If `lazy` is set, the result is a
+        :obj:`~Orange.data.columnar.ColumnarTable` whose columns are computed
+        on their first access, so the variables' `compute_value` functions
+        are called only for the columns that are actually used.
+
         :param domain: the domain for the new table
         :type domain: Orange.data.Domain
         :param source: the source table
         :type source: Orange.data.Table
         :param row_indices: indices of the rows to include
         :type row_indices: a slice or a sequence
+        :param lazy: compute the columns on their first access
+        :type lazy: bool
         :return: a new table
         :rtype: Orange.data.Table
         """
+        if lazy:
+            from Orange.data.columnar import ColumnarTable
+            return ColumnarTable.from_table(domain, source, row_indices, True)
 
         def get_columns(row_indices, src_cols, n_rows):
             if not len(src_cols):
@@ -264,43 +308,75 @@ class Table(MutableSequence, Storage):
                 return _subarray(source._Y, row_indices,
                                  [x - n_src_attrs for x in src_cols])
 
-            types = []
-            if any(isinstance(x, Integral) and 0 <= x < n_src_attrs
-                   for x in src_cols):
-                types.append(source.X.dtype)
-            if any(isinstance(x, Integral) and x < 0 for x in src_cols):
-                types.append(source.metas.dtype)
-            if any(isinstance(x, Integral) and x >= n_src_attrs
-                   for x in src_cols):
-                types.append(source._Y.dtype)
-            new_type = np.find_common_type(types, [])
-            a = np.empty((n_rows, len(src_cols)), dtype=new_type)
+            # columns from the same source array are sliced at once, and
+            # placed at their positions in the result after the other columns
+            groups = [(source.X, []), (source._Y, []), (source.metas, [])]
+            computed = []
             for i, col in enumerate(src_cols):
                 if col is None:
-                    a[:, i] = Unknown
+                    computed.append((i, np.full((n_rows, 1), Unknown)))
                 elif not isinstance(col, Integral):
+                    column = col(source)
                     if row_indices is not ...:
-                        a[:, i] = col(source)[row_indices]
-                    else:
-                        a[:, i] = col(source)
+                        column = column[row_indices]
+                    if not sp.issparse(column):
+                        column = np.asarray(column)
+                    computed.append((i, column.reshape((n_rows, 1))))
                 elif col < 0:
-                    a[:, i] = source.metas[row_indices, -1 - col]
+                    groups[2][1].append((i, -1 - col))
                 elif col < n_src_attrs:
-                    a[:, i] = source.X[row_indices, col]
+                    groups[0][1].append((i, col))
                 else:
-                    a[:, i] = source._Y[row_indices, col - n_src_attrs]
+                    groups[1][1].append((i, col - n_src_attrs))
+            parts = [arr for arr, members in groups if members]
+            blocks = [_subarray(arr, row_indices, [col for _, col in members])
+                      for arr, members in groups if members]
+            positions = [i for _, members in groups for i, _ in members]
+            blocks += [column for _, column in computed]
+            positions += [i for i, _ in computed]
+
+            # the result is sparse if columns come from sparse arrays or are
+            # computed as sparse, unless some columns contain objects
+            if any(sp.issparse(block) for block in blocks) and \
+                    not any(block.dtype == object for block in blocks):
+                stacked = sp.hstack(blocks, format="csc")
+                order = np.empty(len(positions), dtype=int)
+                order[positions] = np.arange(len(positions))
+                return stacked[:, order].tocsr()
+
+            dtypes = [part.dtype for part in parts]
+            if any(column.dtype == object for _, column in computed):
+                dtypes.append(np.dtype(object))
+            new_type = np.find_common_type(dtypes, [])
+            a = np.empty((n_rows, len(src_cols)), dtype=new_type)
+            start = 0
+            for block in blocks:
+                if sp.issparse(block):
+                    block = block.toarray()
+                stop = start + block.shape[1]
+                a[:, positions[start:stop]] = block
+                start = stop
             return a
 
-        new_cache = Table.conversion_cache is None
+        if domain == source.domain:
+            return Table.from_table_rows(source, row_indices)
+
+        # Only tables that hold their data in arrays are cached, so that the
+        # key can tell whether the data has changed
+        if row_indices is ... and "X" in source.__dict__:
+            key = (domain, source,
+                   source.X, source._Y, source.metas, source.W)
+            version = source._data_version()[0]
+        else:
+            key = version = None
+        state = Table._conversion_state
+        nested = getattr(state, "depth", 0) > 0
+        state.depth = getattr(state, "depth", 0) + 1
         try:
-            if new_cache:
-                Table.conversion_cache = {}
-            else:
-                cached = Table.conversion_cache.get((id(domain), id(source)))
-                if cached:
-                    return cached
-            if domain == source.domain:
-                return Table.from_table_rows(source, row_indices)
+            if key is not None:
+                cached = Table.conversion_cache.get(key, version)
+                if cached is not None:
+                    return cached if nested else cached._writable_copy()
 
             if isinstance(row_indices, slice):
                 start, stop, stride = row_indices.indices(source.X.shape[0])
@@ -308,7 +384,7 @@ class Table(MutableSequence, Storage):
                 if n_rows < 0:
                     n_rows = 0
             elif row_indices is ...:
-                n_rows = len(source.X)
+                n_rows = source.X.shape[0]
             else:
                 n_rows = len(row_indices)
 
@@ -331,11 +407,25 @@ class Table(MutableSequence, Storage):
                 self.ids = np.array(source.ids[row_indices])
             else:
                 cls._init_ids(self)
-            Table.conversion_cache[(id(domain), id(source))] = self
+            arrays = (self.X, self._Y, self.metas, self.W)
+            if key is not None and \
+                    all(isinstance(arr, np.ndarray) for arr in arrays):
+                for arr in arrays:
+                    arr.flags.writeable = False
+                Table.conversion_cache.set(key, self, version)
+                if not nested:
+                    return self._writable_copy()
             return self
         finally:
-            if new_cache:
-                Table.conversion_cache = None
+            state.depth -= 1
+
+    def _writable_copy(self):
+        # a copy of a table from conversion_cache for callers outside
+        # conversions, which may change it
+        self = Table.from_table_rows(self, ...)
+        self._changes = None
+        self.ensure_copy()
+        return self
 
     @classmethod
     def from_table_rows(cls, source, row_indices):
@@ -361,6 +451,10 @@ class Table(MutableSequence, Storage):
         self.W = source.W[row_indices]
         self.name = getattr(source, 'name', '')
         self.ids = np.array(source.ids[row_indices])
+        if row_indices is ... or isinstance(row_indices, slice):
+            # the arrays are views, so changes are counted together
+            self._changes = source._get_changes()
+            source._add_view(self)
         return self
 
     @classmethod
@@ -464,7 +558,7 @@ class Table(MutableSequence, Storage):
         :param filename: File name
         :type filename: str
         """
-        ext = os.path.splitext(filename)[1]
+        ext = os.path.splitext(io.split_compression(filename)[0])[1]
         writer = io.FileFormats.writers.get(ext)
         if not writer:
             desc = io.FileFormats.names.get(ext)
@@ -475,24 +569,25 @@ class Table(MutableSequence, Storage):
                 raise IOError("Unknown file name extension.")
         writer().write_file(filename, self)
 
-    @classmethod
-    def from_file(cls, filename):
+    @staticmethod
+    def _find_reader(filename):
         """
-        Read a data table from a file. The path can be absolute or relative.
-
-        :param filename: File name
-        :type filename: str
-        :return: a new data table
-        :rtype: Orange.data.Table
+        Find the file in the current directory or among the data sets, and
+        return its absolute name together with the reader for its format.
         """
         for dir in dataset_dirs:
-            ext = os.path.splitext(filename)[1]
+            ext = os.path.splitext(io.split_compression(filename)[0])[1]
             absolute_filename = os.path.join(dir, filename)
             if not ext:
                 for ext in io.FileFormats.readers:
-                    if os.path.exists(absolute_filename + ext):
-                        absolute_filename += ext
-                        break
+                    for compression in ("", ) + tuple(io.COMPRESSIONS):
+                        if os.path.exists(absolute_filename + ext +
+                                          compression):
+                            absolute_filename += ext + compression
+                            break
+                    else:
+                        continue
+                    break
             if os.path.exists(absolute_filename):
                 break
         else:
@@ -508,14 +603,60 @@ class Table(MutableSequence, Storage):
                               format(desc.lower()))
             else:
                 raise IOError("Unknown file name extension.")
+        return absolute_filename, reader
+
+    @staticmethod
+    def _name_from_filename(filename):
+        base = io.split_compression(os.path.split(filename)[-1])[0]
+        return os.path.splitext(base)[0]
+
+    @classmethod
+    def from_file(cls, filename):
+        """
+        Read a data table from a file. The path can be absolute or relative.
+
+        :param filename: File name
+        :type filename: str
+        :return: a new data table
+        :rtype: Orange.data.Table
+        """
+        absolute_filename, reader = cls._find_reader(filename)
         data = reader().read_file(absolute_filename, cls)
-        data.name = os.path.splitext(os.path.split(filename)[-1])[0]
+        data.name = cls._name_from_filename(filename)
         # no need to call _init_ids as fuctions from .io already
         # construct a table with .ids
 
         data.__file__ = absolute_filename
         return data
 
+    @classmethod
+    def iter_batches(cls, filename, batch_size=10000):
+        """
+        Read a data table from a file in batches of at most `batch_size`
+        rows. Batches are tables with the same domain. Formats that support
+        it are read incrementally, so the memory use does not depend on the
+        size of the file; others are read at once and then sliced.
+
+        :param filename: File name
+        :type filename: str
+        :param batch_size: the maximal number of rows in a batch
+        :type batch_size: int
+        :return: a generator of data tables
+        """
+        absolute_filename, reader = cls._find_reader(filename)
+        reader = reader()
+        if hasattr(reader, "read_batches"):
+            batches = reader.read_batches(absolute_filename, batch_size, cls)
+        else:
+            data = reader.read_file(absolute_filename, cls)
+            batches = (data[i:i + batch_size]
+                       for i in range(0, len(data), batch_size))
+        name = cls._name_from_filename(filename)
+        for batch in batches:
+            batch.name = name
+            batch.__file__ = absolute_filename
+            yield batch
+
     @classmethod
     def from_url(cls, url):
         name = os.path.basename(urllib.parse.urlparse(url)[2])
@@ -563,49 +704,213 @@ class Table(MutableSequence, Storage):
             self.metas[row] = np.array([var.Unknown for var in domain.metas],
                                        dtype=object)
 
+    # Helper function for extend: set rows from the given one onwards to
+    # a list of sequences of values, converting each column at once
+    def _set_rows(self, rows, start):
+        domain = self.domain
+        for j, var in enumerate(domain.variables):
+            values = _values_to_floats(var, [row[j] for row in rows])
+            if j < len(domain.attributes):
+                self.X[start:, j] = values
+            else:
+                self._Y[start:, j - len(domain.attributes)] = values
+        for j, var in enumerate(domain.metas):
+            self.metas[start:, j] = var.Unknown
+        if self.W.shape[-1]:
+            self.W[start:] = 1
+        with type(self)._next_instance_lock:
+            next_id = type(self)._next_instance_id
+            self.ids[start:] = np.arange(next_id, next_id + len(rows))
+            type(self)._next_instance_id += len(rows)
+
+    # Helper function for extend: set ids of rows from the given one onwards
+    # to ids of the given instances; instances without ids get new ones
+    def _set_batch_ids(self, instances, start):
+        if isinstance(instances, Table):
+            self.ids[start:] = instances.ids
+            return
+        ids = [getattr(example, "id", None) for example in instances]
+        missing = [i for i, id_ in enumerate(ids) if id_ is None]
+        with type(self)._next_instance_lock:
+            next_id = type(self)._next_instance_id
+            for i, id_ in zip(missing, range(next_id, next_id + len(missing))):
+                ids[i] = id_
+            type(self)._next_instance_id += len(missing)
+        self.ids[start:] = ids
+
     def _check_all_dense(self):
         return all(x in (Storage.DENSE, Storage.MISSING)
                    for x in (self.X_density(), self.Y_density(),
                              self.metas_density()))
 
+    # the factor by which the capacity of the table grows when rows are added
+    GROWTH_FACTOR = 1.5
+    _buffers = None
+
     # A helper function for extend and insert
-    # Resize X, Y, metas and W.
+    # Resize X, Y, metas, W and ids. The arrays are views into buffers whose
+    # capacity grows geometrically, so appending a row takes amortized
+    # constant time. Rows that are added are set to 0 (or None for metas).
+    # The table writes in place only into buffers that it has allocated
+    # itself (`_buffers`); other arrays are copied into new buffers.
     def _resize_all(self, new_length):
         old_length = self.X.shape[0]
         if old_length == new_length:
             return
         if not self._check_all_dense():
             raise ValueError("Tables with sparse data cannot be resized")
-        try:
-            self.X.resize(new_length, self.X.shape[1])
-            self._Y.resize(new_length, self._Y.shape[1])
-            self.metas.resize(new_length, self.metas.shape[1])
-            if self.W.ndim == 2:
-                self.W.resize((new_length, 0))
+        # like ndarray.resize, refuse to resize data that other tables view
+        if self._has_views():
+            raise ValueError("Tables whose data is viewed by other tables "
+                             "cannot be resized")
+        arrays = [self.X, self._Y, self.metas, self.W, self.ids]
+        buffers = self._buffers
+        own = buffers is not None and \
+            all(_is_prefix(arr, buf) for arr, buf in zip(arrays, buffers))
+        if not own and any(arr.base is not None and arr.size
+                           for arr in arrays):
+            raise ValueError("Tables that do not own their data "
+                             "cannot be resized")
+        if not own or new_length > buffers[0].shape[0]:
+            if new_length < old_length:
+                capacity = new_length
             else:
-                self.W.resize(new_length)
-            self.ids.resize(new_length)
-        except Exception:
-            if self.X.shape[0] == new_length:
-                self.X.resize(old_length, self.X.shape[1])
-            if self._Y.shape[0] == new_length:
-                self._Y.resize(old_length, self._Y.shape[1])
-            if self.metas.shape[0] == new_length:
-                self.metas.resize(old_length, self.metas.shape[1])
-            if self.W.shape[0] == new_length:
-                if self.W.ndim == 2:
-                    self.W.resize((old_length, 0))
-                else:
-                    self.W.resize(old_length)
-            if self.ids.shape[0] == new_length:
-                self.ids.resize(old_length)
-            raise
+                capacity = max(new_length, int(
+                    (buffers if own else arrays)[0].shape[0] *
+                    self.GROWTH_FACTOR))
+            n_kept = min(old_length, new_length)
+            new_buffers = []
+            for arr in arrays:
+                buf = np.empty((capacity, ) + arr.shape[1:], dtype=arr.dtype)
+                buf[:n_kept] = arr[:n_kept]
+                new_buffers.append(buf)
+            buffers = self._buffers = new_buffers
+        self.X, self._Y, self.metas, self.W, self.ids = \
+            [buf[:new_length] for buf in buffers]
+        for buf in buffers:
+            buf[old_length:new_length] = None if buf.dtype == object else 0
+
+    _views = None
+    _viewed = []
+
+    def _add_view(self, view):
+        # remember tables that view this table's data, which cannot be
+        # resized while they exist; views of views are added to all tables
+        # whose data they view
+        view._viewed = [weakref.ref(self)] + self._viewed
+        for ref in view._viewed:
+            table = ref()
+            if table is not None:
+                table._views = [view_ref for view_ref in table._views or ()
+                                if view_ref() is not None] + \
+                    [weakref.ref(view)]
+
+    def _has_views(self):
+        arrays = [self.X, self._Y, self.metas, self.W]
+        for ref in self._views or ():
+            view = ref()
+            # views may have copied their data since, e.g. by ensure_copy
+            if view is not None and any(
+                    np.may_share_memory(arr, view_arr)
+                    for arr, view_arr in zip(
+                        arrays, (view.X, view._Y, view.metas, view.W))
+                    if arr.size):
+                return True
+        return False
+
+    def _owns(self, arr):
+        return arr.base is None or \
+            self._buffers is not None and \
+            any(arr.base is buf for buf in self._buffers)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_buffers", None)
+        state.pop("_views", None)
+        state.pop("_viewed", None)
+        state.pop("_checksums", None)
+        state.pop("_changes", None)
+        if self._indexes:
+            state["_indexes"] = dict.fromkeys(self._indexes)
+        return state
+
+    _indexes = None
+
+    def create_index(self, column):
+        """
+        Create an index that speeds up range and equality filters
+        (:obj:`~Orange.data.filter.FilterContinuous`,
+        :obj:`~Orange.data.filter.FilterDiscrete`) on the given column.
+
+        The index is built when it is first used and rebuilt after the
+        data is changed by the table's methods, through views made by
+        :obj:`from_table_rows`, or by replacing the arrays. After writing
+        into the arrays directly, call :obj:`mark_changed`.
+
+        :param column: the column
+        :type column: int, str or Orange.data.Variable
+        """
+        column = self.domain.index(column)
+        if not self.domain[column].is_primitive():
+            raise ValueError("Only columns with primitive variables "
+                             "can be indexed")
+        if self._indexes is None:
+            self._indexes = {}
+        self._indexes.setdefault(column, None)
+
+    def drop_index(self, column):
+        """Remove the index on the given column."""
+        column = self.domain.index(column)
+        if self._indexes:
+            self._indexes.pop(column, None)
+
+    def invalidate_indexes(self):
+        """Mark indexes as outdated, so they are built again when used."""
+        if self._indexes:
+            self._indexes = dict.fromkeys(self._indexes)
+
+    def _get_index(self, column):
+        if not self._indexes or column not in self._indexes:
+            return None
+        version = self._data_version()
+        index = self._indexes[column]
+        if index is None or not _same_version(index[0], version):
+            index = self._indexes[column] = \
+                (version, _ColumnIndex(self.get_column_view(column)[0]))
+        return index[1]
+
+    def __iter__(self):
+        if any(sp.issparse(arr) for arr in (self.X, self._Y, self.metas)):
+            for i in range(len(self)):
+                yield RowInstance(self, i)
+            return
+        from_row = RowInstance._from_dense_row
+        for i, (x, y, metas, id_) in enumerate(
+                zip(self.X, self._Y, self.metas, self.ids)):
+            yield from_row(self, i, x, y, metas, id_)
+
+    def batches(self, batch_size=1000):
+        """
+        Iterate over the table in batches of at most `batch_size` rows.
+
+        Batches are tables with the same domain whose arrays are views into
+        this table's arrays, so loops can process rows with numpy operations
+        on `X`, `Y` and `metas` instead of constructing an instance for each
+        row.
+
+        :param batch_size: the maximal number of rows in a batch
+        :type batch_size: int
+        :return: a generator of data tables
+        """
+        for start in range(0, len(self), batch_size):
+            yield self.from_table_rows(
+                self, slice(start, start + batch_size))
 
     def __getitem__(self, key):
         if isinstance(key, Integral):
             return RowInstance(self, key)
         if not isinstance(key, tuple):
-            return Table.from_table_rows(self, key)
+            return self.from_table_rows(self, key)
 
         if len(key) != 2:
             raise IndexError("Table indices must be one- or two-dimensional")
@@ -649,6 +954,7 @@ class Table(MutableSequence, Storage):
         if not self._check_all_dense():
             raise ValueError(
                 "Assignment to rows of sparse data is not supported")
+        self.mark_changed()
         if not isinstance(key, tuple):
             if isinstance(value, Real):
                 self.X[key, :] = value
@@ -736,6 +1042,7 @@ class Table(MutableSequence, Storage):
     def __delitem__(self, key):
         if not self._check_all_dense():
             raise ValueError("Rows of sparse data cannot be deleted")
+        self.mark_changed()
         if key is ...:
             key = range(len(self))
         self.X = np.delete(self.X, key, axis=0)
@@ -784,6 +1091,7 @@ class Table(MutableSequence, Storage):
             row += len(self)
         if row < 0 or row > len(self):
             raise IndexError("Index out of range")
+        self.mark_changed()
         self._resize_all(len(self) + 1)
         if row < len(self):
             self.X[row + 1:] = self.X[row:-1]
@@ -810,12 +1118,14 @@ class Table(MutableSequence, Storage):
         as a table of the same or a different domain, or a sequence. In the
         latter case, each instances can be given as
         :obj:`~Orange.data.Instance` or a sequence of values (e.g. list,
-        tuple, numpy.array).
+        tuple, numpy.array). Sequences of values are converted column by
+        column; like with :obj:`insert`, meta attributes are unknown.
 
         :param instances: additional instances
         :type instances: Orange.data.Table or a sequence of instances
         """
         old_length = len(self)
+        self.mark_changed()
         self._resize_all(old_length + len(instances))
         try:
             # shortcut
@@ -829,6 +1139,24 @@ class Table(MutableSequence, Storage):
                     else:
                         self.W[old_length:] = 1
                 self.ids[old_length:] = instances.ids
+            elif not any(isinstance(example, (Instance, Real))
+                         for example in instances):
+                self._set_rows(instances, old_length)
+            elif isinstance(instances, Table) or all(
+                    isinstance(example, Instance) for example in instances):
+                X, Y, metas = self.domain.convert_batch(instances)
+                self.X[old_length:] = X.toarray() if sp.issparse(X) else X
+                self._Y[old_length:] = Y.toarray() if sp.issparse(Y) else Y
+                self.metas[old_length:] = \
+                    metas.toarray() if sp.issparse(metas) else metas
+                if self.W.shape[-1]:
+                    if isinstance(instances, Table):
+                        self.W[old_length:] = \
+                            instances.W if instances.W.shape[-1] else 1
+                    else:
+                        self.W[old_length:] = [example.weight
+                                               for example in instances]
+                self._set_batch_ids(instances, old_length)
             else:
                 for i, example in enumerate(instances):
                     self[old_length + i] = example
@@ -846,31 +1174,32 @@ class Table(MutableSequence, Storage):
         """
         Return `True` if all arrays represent a view referring to another table
         """
-        return ((not self.X.shape[-1] or self.X.base is not None) and
-                (not self._Y.shape[-1] or self._Y.base is not None) and
-                (not self.metas.shape[-1] or self.metas.base is not None) and
-                (not self._weights.shape[-1] or self.W.base is not None))
+        return ((not self.X.shape[-1] or not self._owns(self.X)) and
+                (not self._Y.shape[-1] or not self._owns(self._Y)) and
+                (not self.metas.shape[-1] or not self._owns(self.metas)) and
+                (not self._weights.shape[-1] or not self._owns(self.W)))
 
     def is_copy(self):
         """
         Return `True` if the table owns its data
         """
-        return ((not self.X.shape[-1] or self.X.base is None) and
-                (self._Y.base is None) and
-                (self.metas.base is None) and
-                (self.W.base is None))
+        return ((not self.X.shape[-1] or self._owns(self.X)) and
+                self._owns(self._Y) and
+                self._owns(self.metas) and
+                self._owns(self.W))
 
     def ensure_copy(self):
         """
         Ensure that the table owns its data; copy arrays when necessary
         """
-        if self.X.base is not None:
+        self.mark_changed()
+        if not self._owns(self.X):
             self.X = self.X.copy()
-        if self._Y.base is not None:
+        if not self._owns(self._Y):
             self._Y = self._Y.copy()
-        if self.metas.base is not None:
+        if not self._owns(self.metas):
             self.metas = self.metas.copy()
-        if self.W.base is not None:
+        if not self._owns(self.W):
             self.W = self.W.copy()
 
     @staticmethod
@@ -908,6 +1237,7 @@ class Table(MutableSequence, Storage):
         """
         if not self.W.shape[-1]:
             self.W = np.empty(len(self))
+        self.mark_changed()
         self.W[:] = weight
 
     def has_weights(self):
@@ -931,22 +1261,64 @@ class Table(MutableSequence, Storage):
         """Return `True` if there are any missing class values."""
         return bn.anynan(self._Y)
 
+    _changes = None
+
+    def _get_changes(self):
+        if self._changes is None:
+            self._changes = _Changes()
+        return self._changes
+
+    def _data_version(self):
+        """
+        Return the number of changes of the table's data and its arrays.
+        The data is the same while both are the same (see
+        :obj:`_same_version`).
+        """
+        changes = self._changes
+        return (0 if changes is None else changes.count,
+                (self.X, self._Y, self.metas, self.W))
+
+    def mark_changed(self):
+        """
+        Tell the table that its data has changed, so checksums, indexes and
+        conversions are computed again. The table's methods call this
+        automatically, also for changes through tables that view the same
+        rows (see :obj:`from_table_rows`); call it after writing into the
+        arrays directly.
+        """
+        self._get_changes().count += 1
+        self.invalidate_indexes()
+
     def checksum(self, include_metas=True):
-        # TODO: zlib.adler32 does not work for numpy arrays with dtype object
-        # (after pickling and unpickling such arrays, checksum changes)
-        # Why, and should we fix it or remove it?
-        """Return a checksum over X, Y, metas and W."""
-        cs = zlib.adler32(np.ascontiguousarray(self.X))
-        cs = zlib.adler32(np.ascontiguousarray(self._Y), cs)
-        if include_metas:
-            cs = zlib.adler32(np.ascontiguousarray(self.metas), cs)
-        cs = zlib.adler32(np.ascontiguousarray(self.W), cs)
-        return cs
+        """
+        Return a checksum over X, Y, metas and W.
+
+        The checksum is computed once for each change of the data (see
+        :obj:`mark_changed`) or of the arrays. Objects are hashed by their
+        identities, like in other arrays, so copies of tables with objects,
+        e.g. unpickled tables, have different checksums.
+        """
+        version = self._data_version()
+        cached = self.__dict__.get("_checksums")
+        if cached is None or not _same_version(cached[0], version):
+            cached = self._checksums = (version, {})
+        checksums = cached[1]
+        include_metas = bool(include_metas)
+        if include_metas not in checksums:
+            arrays = [self.X, self._Y, self.metas, self.W]
+            if not include_metas:
+                del arrays[2]
+            cs = 1
+            for arr in arrays:
+                cs = _array_checksum(arr, cs)
+            checksums[include_metas] = cs
+        return checksums[include_metas]
 
     def shuffle(self):
         """Randomly shuffle the rows of the table."""
         if not self._check_all_dense():
             raise ValueError("Rows of sparse data cannot be shuffled")
+        self.mark_changed()
         ind = np.arange(self.X.shape[0])
         np.random.shuffle(ind)
         self.X = self.X[ind]
@@ -1001,7 +1373,7 @@ class Table(MutableSequence, Storage):
                 else:
                     remove = np.logical_or(remove, bn.anynan([col], axis=0))
         retain = remove if negate else np.logical_not(remove)
-        return Table.from_table_rows(self, retain)
+        return self.from_table_rows(self, retain)
 
     def _filter_has_class(self, negate=False):
         if sp.issparse(self._Y):
@@ -1015,7 +1387,7 @@ class Table(MutableSequence, Storage):
             retain = bn.anynan(self._Y, axis=1)
             if not negate:
                retain = np.logical_not(retain)
-        return Table.from_table_rows(self, retain)
+        return self.from_table_rows(self, retain)
 
     def _filter_same_value(self, column, value, negate=False):
         if not isinstance(value, Real):
@@ -1023,113 +1395,29 @@ class Table(MutableSequence, Storage):
         sel = self.get_column_view(column)[0] == value
         if negate:
             sel = np.logical_not(sel)
-        return Table.from_table_rows(self, sel)
+        return self.from_table_rows(self, sel)
 
-    def _filter_values(self, filter):
-        from Orange.data import filter as data_filter
+    # tables with more rows are filtered in chunks of this size by
+    # FILTER_N_JOBS threads; if FILTER_N_JOBS is None, rows are not chunked
+    FILTER_CHUNK_SIZE = 1000000
+    FILTER_N_JOBS = None
 
-        if isinstance(filter, data_filter.Values):
-            conditions = filter.conditions
-            conjunction = filter.conjunction
-        else:
-            conditions = [filter]
-            conjunction = True
-        if conjunction:
-            sel = np.ones(len(self), dtype=bool)
+    def _filter_values(self, filter):
+        plan = _FilterPlan(filter, self.domain, self._get_index)
+        columns = {col: self.get_column_view(col)[0] for col in plan.columns}
+        n_rows = len(self)
+        chunk_size = self.FILTER_CHUNK_SIZE
+        if self.FILTER_N_JOBS and n_rows > chunk_size:
+            def evaluate(start):
+                return plan(columns,
+                            np.arange(start, min(start + chunk_size, n_rows)))
+
+            with ThreadPoolExecutor(self.FILTER_N_JOBS) as executor:
+                sel = np.concatenate(list(
+                    executor.map(evaluate, range(0, n_rows, chunk_size))))
         else:
-            sel = np.zeros(len(self), dtype=bool)
-
-        for f in conditions:
-            col = self.get_column_view(f.column)[0]
-            if isinstance(f, data_filter.FilterDiscrete) and f.values is None \
-                    or isinstance(f, data_filter.FilterContinuous) and \
-                    f.oper == f.IsDefined:
-                if conjunction:
-                    sel *= np.isnan(col)
-                else:
-                    sel += np.isnan(col)
-            elif isinstance(f, data_filter.FilterString) and \
-                    f.oper == f.IsDefined:
-                if conjunction:
-                    sel *= (col != "")
-                else:
-                    sel += (col != "")
-            elif isinstance(f, data_filter.FilterDiscrete):
-                if conjunction:
-                    s2 = np.zeros(len(self), dtype=bool)
-                    for val in f.values:
-                        if not isinstance(val, Real):
-                            val = self.domain[f.column].to_val(val)
-                        s2 += (col == val)
-                    sel *= s2
-                else:
-                    for val in f.values:
-                        if not isinstance(val, Real):
-                            val = self.domain[f.column].to_val(val)
-                        sel += (col == val)
-            elif isinstance(f, data_filter.FilterStringList):
-                if not f.case_sensitive:
-                    #noinspection PyTypeChecker
-                    col = np.char.lower(np.array(col, dtype=str))
-                    vals = [val.lower() for val in f.values]
-                else:
-                    vals = f.values
-                if conjunction:
-                    sel *= reduce(operator.add,
-                                  (col == val for val in vals))
-                else:
-                    sel = reduce(operator.add,
-                                 (col == val for val in vals), sel)
-            elif isinstance(f, (data_filter.FilterContinuous,
-                                data_filter.FilterString)):
-                if (isinstance(f, data_filter.FilterString) and
-                        not f.case_sensitive):
-                    #noinspection PyTypeChecker
-                    col = np.char.lower(np.array(col, dtype=str))
-                    fmin = f.min.lower()
-                    if f.oper in [f.Between, f.Outside]:
-                        fmax = f.max.lower()
-                else:
-                    fmin, fmax = f.min, f.max
-                if f.oper == f.Equal:
-                    col = (col == fmin)
-                elif f.oper == f.NotEqual:
-                    col = (col != fmin)
-                elif f.oper == f.Less:
-                    col = (col < fmin)
-                elif f.oper == f.LessEqual:
-                    col = (col <= fmin)
-                elif f.oper == f.Greater:
-                    col = (col > fmin)
-                elif f.oper == f.GreaterEqual:
-                    col = (col >= fmin)
-                elif f.oper == f.Between:
-                    col = (col >= fmin) * (col <= fmax)
-                elif f.oper == f.Outside:
-                    col = (col < fmin) + (col > fmax)
-                elif not isinstance(f, data_filter.FilterString):
-                    raise TypeError("Invalid operator")
-                elif f.oper == f.Contains:
-                    col = np.fromiter((fmin in e for e in col),
-                                      dtype=bool)
-                elif f.oper == f.StartsWith:
-                    col = np.fromiter((e.startswith(fmin) for e in col),
-                                      dtype=bool)
-                elif f.oper == f.EndsWith:
-                    col = np.fromiter((e.endswith(fmin) for e in col),
-                                      dtype=bool)
-                else:
-                    raise TypeError("Invalid operator")
-                if conjunction:
-                    sel *= col
-                else:
-                    sel += col
-            else:
-                raise TypeError("Invalid filter")
-
-        if filter.negate:
-            sel = ~sel
-        return Table.from_table_rows(self, sel)
+            sel = plan(columns, ...)
+        return self.from_table_rows(self, sel)
 
     def _compute_basic_stats(self, columns=None,
                              include_metas=False, compute_variance=False):
@@ -1163,57 +1451,48 @@ class Table(MutableSequence, Storage):
         return stats
 
     def _compute_distributions(self, columns=None):
-        def _get_matrix(M, cachedM, col):
-            nonlocal single_column
-            if not sp.issparse(M):
-                return M[:, col], self.W if self.has_weights() else None, None
-            if cachedM is None:
-                if single_column:
-                    warn(ResourceWarning,
-                         "computing distributions on sparse data "
-                         "for a single column is inefficient")
-                cachedM = sp.csc_matrix(self.X)
-            data = cachedM.data[cachedM.indptr[col]:cachedM.indptr[col+1]]
-            if self.has_weights():
-                weights = self.W[
-                    cachedM.indices[cachedM.indptr[col]:cachedM.indptr[col+1]]]
-            else:
-                weights = None
-            return data, weights, cachedM
-
         if columns is None:
             columns = range(len(self.domain.variables))
             single_column = False
         else:
             columns = [self.domain.index(var) for var in columns]
             single_column = len(columns) == 1 and len(self.domain) > 1
-        distributions = []
-        Xcsc = Ycsc = None
-        for col in columns:
-            var = self.domain[col]
-            if col < self.X.shape[1]:
-                m, W, Xcsc = _get_matrix(self.X, Xcsc, col)
-            else:
-                m, W, Ycsc = _get_matrix(self._Y, Ycsc, col - self.X.shape[1])
-            if isinstance(var, DiscreteVariable):
-                if W is not None:
-                    W = W.ravel()
-                dist, unknowns = bn.bincount(m, len(var.values)-1, W)
-            elif not len(m):
-                dist, unknowns = np.zeros((2, 0)), 0
-            else:
-                if W is not None:
-                    ranks = np.argsort(m)
-                    vals = np.vstack((m[ranks], W[ranks].flatten()))
-                    unknowns = bn.countnans(m, W)
-                else:
-                    vals = np.ones((2, m.shape[0]))
-                    vals[0, :] = m
-                    vals[0, :].sort()
-                    unknowns = bn.countnans(m)
-                dist = np.array(_valuecount.valuecount(vals))
-            distributions.append((dist, unknowns))
-
+        variables = [self.domain[col] for col in columns]
+        W = self.W.reshape(-1) if self.has_weights() else None
+        n_attrs = self.X.shape[1]
+        distributions = [None] * len(columns)
+        # Columns are grouped by the array they come from and by their type;
+        # distributions for each group are computed at once
+        for part, part_cols in (
+                (self.X, [(i, col) for i, col in enumerate(columns)
+                          if 0 <= col < n_attrs]),
+                (self._Y, [(i, col - n_attrs) for i, col in enumerate(columns)
+                           if col >= n_attrs]),
+                (self.metas, [(i, -1 - col) for i, col in enumerate(columns)
+                              if col < 0])):
+            if not part_cols:
+                continue
+            if sp.issparse(part):
+                if single_column:
+                    warn("computing distributions on sparse data "
+                         "for a single column is inefficient",
+                         ResourceWarning)
+                part = sp.csc_matrix(part)
+            disc = [(i, col) for i, col in part_cols
+                    if isinstance(variables[i], DiscreteVariable)]
+            cont = [(i, col) for i, col in part_cols
+                    if not isinstance(variables[i], DiscreteVariable)]
+            if disc:
+                n_values = [len(variables[i].values) for i, _ in disc]
+                dists = _discrete_distributions(
+                    part, [col for _, col in disc], n_values, W)
+                for (i, _), dist in zip(disc, dists):
+                    distributions[i] = dist
+            if cont:
+                dists = _continuous_distributions(
+                    part, [col for _, col in cont], W)
+                for (i, _), dist in zip(cont, dists):
+                    distributions[i] = dist
         return distributions
 
     def _compute_contingency(self, col_vars=None, row_var=None):
@@ -1354,7 +1633,486 @@ def _check_inf(array):
             np.isinf(array.data).any()
 
 
+class _FilterPlan:
+    """
+    A filter (:obj:`~Orange.data.filter.Values`, possibly nested, or a single
+    value filter) compiled for evaluation on columns of a table.
+
+    Calling the plan with a dictionary of columns (as returned by
+    `get_column_view` for indices in `columns`) and an array of row indices
+    (or `...` for all rows) returns a boolean mask over these rows.
+    Conditions in `filter.Values` are evaluated in turn, each only on rows
+    whose outcome is not decided yet by previous conditions. Range and
+    equality conditions on columns for which `get_index` returns an index
+    (:obj:`_ColumnIndex`) use the index instead of comparing all values.
+    """
+    def __init__(self, filter, domain, get_index=None):
+        self.columns = set()
+        self.get_index = get_index or (lambda column: None)
+        self.evaluate = self._compile(filter, domain)
+
+    def __call__(self, columns, rows=...):
+        return self.evaluate(columns, rows)
+
+    def _compile(self, filter, domain):
+        from Orange.data import filter as data_filter
+
+        if isinstance(filter, data_filter.Values):
+            conditions = [self._compile(f, domain) for f in filter.conditions]
+            return self._combine(conditions, filter.conjunction,
+                                 filter.negate)
+        if not isinstance(filter, data_filter.ValueFilter):
+            raise TypeError("Invalid filter")
+        column = domain.index(filter.column)
+        self.columns.add(column)
+        intervals = _filter_intervals(filter, domain[column])
+        index = intervals is not None and self.get_index(column)
+        if index:
+            evaluate = lambda columns, rows: index.select(
+                intervals, columns[column], rows)
+        else:
+            test = _compile_condition(filter, domain[column])
+            evaluate = lambda columns, rows: test(
+                columns[column] if rows is ... else columns[column][rows])
+        if getattr(filter, "negate", False):
+            return lambda columns, rows: ~evaluate(columns, rows)
+        return evaluate
+
+    @staticmethod
+    def _combine(conditions, conjunction, negate):
+        def evaluate(columns, rows):
+            # `undecided` holds positions (in `rows`) of rows whose outcome
+            # depends on the remaining conditions; `None` stands for all
+            undecided = None
+            sel = None
+            for condition in conditions:
+                if undecided is None:
+                    mask = condition(columns, rows)
+                    sel = np.zeros(len(mask), dtype=bool)
+                    undecided = np.arange(len(mask))
+                else:
+                    mask = condition(
+                        columns, undecided if rows is ... else rows[undecided])
+                if conjunction:
+                    undecided = undecided[mask]
+                else:
+                    sel[undecided[mask]] = True
+                    undecided = undecided[~mask]
+                if not len(undecided):
+                    break
+            if conjunction:
+                sel[undecided] = True
+            return ~sel if negate else sel
+
+        return evaluate
+
+
+class _ColumnIndex:
+    """
+    An index of a column with numeric values: the permutation that sorts
+    the column's defined values, and minimal and maximal values in blocks
+    of `BLOCK_SIZE` consecutive rows.
+
+    Selecting all rows within intervals uses binary search on sorted
+    values. Selecting among given rows decides whole blocks whose values
+    are all inside or outside the intervals, and compares values only for
+    rows in the remaining blocks.
+    """
+    BLOCK_SIZE = 1024
+
+    def __init__(self, col):
+        col = np.asarray(col, dtype=float)
+        self.n_rows = n_rows = len(col)
+        order = np.argsort(col, kind="mergesort")
+        n_defined = n_rows - np.count_nonzero(np.isnan(col))
+        self.order = order[:n_defined]
+        self.sorted = col[self.order]
+
+        size = self.BLOCK_SIZE
+        n_blocks = -(-n_rows // size)
+        blocks = np.empty(n_blocks * size)
+        blocks[:n_rows] = col
+        if n_rows:
+            # pad with a value from the last block, which keeps its min/max
+            blocks[n_rows:] = col[(n_blocks - 1) * size]
+        blocks = blocks.reshape(n_blocks, size)
+        self.block_min = np.fmin.reduce(blocks, axis=1)
+        self.block_max = np.fmax.reduce(blocks, axis=1)
+        self.block_nan = np.isnan(blocks).any(axis=1)
+
+    def _bounds(self, lo, hi, lo_inclusive, hi_inclusive):
+        sorted_values = self.sorted
+        start = 0 if lo is None else np.searchsorted(
+            sorted_values, lo, "left" if lo_inclusive else "right")
+        stop = len(sorted_values) if hi is None else np.searchsorted(
+            sorted_values, hi, "right" if hi_inclusive else "left")
+        return start, max(start, stop)
+
+    def select(self, intervals, col, rows=...):
+        """
+        Return a boolean mask for all rows or for those given by `rows`,
+        telling whether their values lie within any of the intervals.
+        An interval is a tuple (lo, hi, lo_inclusive, hi_inclusive), where
+        `lo` and `hi` can be `None` for unbounded intervals; `col` is the
+        indexed column.
+        """
+        if rows is ...:
+            mask = np.zeros(self.n_rows, dtype=bool)
+            for interval in intervals:
+                start, stop = self._bounds(*interval)
+                mask[self.order[start:stop]] = True
+            return mask
+
+        inside = np.zeros(len(self.block_min), dtype=bool)
+        outside = np.ones(len(self.block_min), dtype=bool)
+        for lo, hi, lo_inclusive, hi_inclusive in intervals:
+            inside |= _in_interval(self.block_min, lo, None, lo_inclusive) & \
+                _in_interval(self.block_max, None, hi, True, hi_inclusive) & \
+                ~self.block_nan
+            outside &= ~_in_interval(self.block_max, lo, None, lo_inclusive) | \
+                ~_in_interval(self.block_min, None, hi, True, hi_inclusive)
+        blocks = rows // self.BLOCK_SIZE
+        mask = inside[blocks]
+        undecided = np.flatnonzero(~(inside | outside)[blocks])
+        values = col[rows[undecided]]
+        mask[undecided] = reduce(
+            np.logical_or,
+            (_in_interval(values, *interval) for interval in intervals))
+        return mask
+
+
+def _in_interval(values, lo, hi, lo_inclusive=True, hi_inclusive=True):
+    mask = np.ones(len(values), dtype=bool)
+    if lo is not None:
+        mask &= values >= lo if lo_inclusive else values > lo
+    if hi is not None:
+        mask &= values <= hi if hi_inclusive else values < hi
+    return mask
+
+
+def _filter_intervals(f, var):
+    """
+    Return a list of intervals (see :obj:`_ColumnIndex.select`) with values
+    that match the value filter `f`, or `None` if the filter cannot use an
+    index.
+    """
+    from Orange.data import filter as data_filter
+
+    if isinstance(f, data_filter.FilterDiscrete):
+        if f.values is None:
+            return None
+        values = [val if isinstance(val, Real) else var.to_val(val)
+                  for val in f.values]
+        return [(val, val, True, True) for val in values]
+    if not isinstance(f, data_filter.FilterContinuous):
+        return None
+    fmin, fmax = f.min, f.max
+    return {
+        f.Equal: [(fmin, fmin, True, True)],
+        f.Less: [(None, fmin, True, False)],
+        f.LessEqual: [(None, fmin, True, True)],
+        f.Greater: [(fmin, None, False, True)],
+        f.GreaterEqual: [(fmin, None, True, True)],
+        f.Between: [(fmin, fmax, True, True)],
+        f.Outside: [(None, fmin, True, False), (fmax, None, False, True)]
+    }.get(f.oper)
+
+
+def _compile_condition(f, var):
+    """
+    Return a function that takes a column and returns a boolean mask of
+    values that match the value filter `f`.
+    """
+    from Orange.data import filter as data_filter
+
+    if isinstance(f, data_filter.FilterDiscrete) and f.values is None or \
+            isinstance(f, data_filter.FilterContinuous) and \
+            f.oper == f.IsDefined:
+        return lambda col: ~np.isnan(col)
+    if isinstance(f, data_filter.FilterString) and f.oper == f.IsDefined:
+        return lambda col: col != ""
+    if isinstance(f, data_filter.FilterDiscrete):
+        values = [val if isinstance(val, Real) else var.to_val(val)
+                  for val in f.values]
+        return lambda col: np.in1d(col, values)
+    if isinstance(f, data_filter.FilterStringList):
+        if f.case_sensitive:
+            values = set(f.values)
+            return lambda col: _str_in(col, values)
+        values = set(f.values_lower)
+        return lambda col: _str_in(_str_lower(col), values)
+
+    if not isinstance(f, (data_filter.FilterContinuous,
+                          data_filter.FilterString)):
+        raise TypeError("Invalid filter")
+    fmin, fmax = f.min, f.max
+    if isinstance(f, data_filter.FilterString) and not f.case_sensitive:
+        prepare = _str_lower
+        fmin = fmin.lower()
+        if f.oper in [f.Between, f.Outside]:
+            fmax = fmax.lower()
+    else:
+        prepare = lambda col: col
+    if f.oper == f.Equal:
+        test = lambda col: col == fmin
+    elif f.oper == f.NotEqual:
+        test = lambda col: col != fmin
+    elif f.oper == f.Less:
+        test = lambda col: col < fmin
+    elif f.oper == f.LessEqual:
+        test = lambda col: col <= fmin
+    elif f.oper == f.Greater:
+        test = lambda col: col > fmin
+    elif f.oper == f.GreaterEqual:
+        test = lambda col: col >= fmin
+    elif f.oper == f.Between:
+        test = lambda col: (col >= fmin) * (col <= fmax)
+    elif f.oper == f.Outside:
+        test = lambda col: (col < fmin) + (col > fmax)
+    elif not isinstance(f, data_filter.FilterString):
+        raise TypeError("Invalid operator")
+    elif f.oper == f.Contains:
+        test = lambda col: _str_match(col, "find", fmin)
+    elif f.oper == f.StartsWith:
+        test = lambda col: _str_match(col, "startswith", fmin)
+    elif f.oper == f.EndsWith:
+        test = lambda col: _str_match(col, "endswith", fmin)
+    else:
+        raise TypeError("Invalid operator")
+    return lambda col: test(prepare(col))
+
+
+def _str_lower(col):
+    from Orange.data.columnar import CodedColumn
+    if isinstance(col, CodedColumn):
+        return col.lower()
+    #noinspection PyTypeChecker
+    return np.char.lower(np.array(col, dtype=str))
+
+
+def _str_in(col, values):
+    from Orange.data.columnar import CodedColumn
+    if isinstance(col, CodedColumn):
+        return col.map(values.__contains__)
+    return np.in1d(np.array(col, dtype=str), list(values))
+
+
+# Vectorized string matching: `method` is "find", "startswith" or "endswith";
+# dictionary-encoded columns are matched on their distinct values
+def _str_match(col, method, ref):
+    from Orange.data.columnar import CodedColumn
+    if isinstance(col, CodedColumn):
+        if method == "find":
+            return col.map(lambda e: ref in e)
+        return col.map(lambda e: getattr(e, method)(ref))
+    #noinspection PyTypeChecker
+    col = np.array(col, dtype=str)
+    if method == "find":
+        return np.char.find(col, ref) >= 0
+    return getattr(np.char, method)(col, ref)
+
+
+# the number of values that distributions are computed for at once; the
+# columns of larger tables are split into chunks
+DISTRIBUTIONS_CHUNK_SIZE = 2 ** 22
+
+
+def _column_chunks(part, cols):
+    """
+    Split the columns into chunks and yield them as CSC matrices (if the
+    array is sparse) or as copies in dense float arrays.
+    """
+    chunk_size = max(1, DISTRIBUTIONS_CHUNK_SIZE // max(part.shape[0], 1))
+    for start in range(0, len(cols), chunk_size):
+        chunk = cols[start:start + chunk_size]
+        # slicing is faster than indexing with a list
+        if chunk == list(range(chunk[0], chunk[0] + len(chunk))):
+            chunk = slice(chunk[0], chunk[0] + len(chunk))
+        if sp.issparse(part):
+            yield part[:, chunk]
+        else:
+            yield np.array(part[:, chunk], dtype=float)
+
+
+def _discrete_distributions(part, cols, n_values, W=None):
+    """
+    Return a list of tuples with distributions and the number (or weight)
+    of unknown values for the given discrete columns of a dense or CSC
+    array. Values of all columns are counted by a single `np.bincount`
+    over codes shifted by offsets of columns. Values that are out of the
+    variable's range extend the distribution, like in `bn.bincount`;
+    negative values raise `ValueError`, since they would be counted in the
+    preceding column.
+    """
+    distributions = []
+    n_values = np.asarray(n_values, dtype=int)
+    start = 0
+    for sub in _column_chunks(part, cols):
+        k = sub.shape[1]
+        n_slots = n_values[start:start + k].copy()
+        start += k
+        if sp.issparse(sub):
+            values = sub.data.astype(float)
+            pos = np.repeat(np.arange(k), np.diff(sub.indptr))
+            weights = W[sub.indices] if W is not None else None
+            nans = np.isnan(values)
+            unknowns = np.bincount(
+                pos[nans], None if weights is None else weights[nans],
+                minlength=k)
+            defined = ~nans
+            if (values[defined] < 0).any():
+                raise ValueError("Negative discrete values")
+            values = values[defined].astype(int)
+            pos = pos[defined]
+            over = values >= n_slots[pos]
+            np.maximum.at(n_slots, pos[over], values[over] + 1)
+            offsets = np.concatenate(([0], np.cumsum(n_slots)))
+            counts = np.bincount(
+                offsets[pos] + values,
+                None if weights is None else weights[defined],
+                minlength=offsets[-1])
+        else:
+            nans = np.isnan(sub)
+            unknowns = nans.sum(axis=0) if W is None else W.dot(nans)
+            if len(sub):
+                if (np.fmin.reduce(sub, axis=0) < 0).any():
+                    raise ValueError("Negative discrete values")
+                largest = np.fmax.reduce(sub, axis=0)
+                over = largest >= n_slots
+                n_slots[over] = largest[over] + 1
+            offsets = np.concatenate(([0], np.cumsum(n_slots)))
+            # unknown values are counted in an extra slot at the end
+            sub += offsets[:-1]
+            np.copyto(sub, offsets[-1], where=nans)
+            weights = None if W is None else \
+                np.broadcast_to(W[:, None], sub.shape).ravel()
+            counts = np.bincount(sub.astype(np.intp).ravel(), weights,
+                                 minlength=offsets[-1] + 1)
+        counts = counts.astype(float)
+        distributions.extend(
+            (counts[offsets[j]:offsets[j + 1]], unknowns[j])
+            for j in range(k))
+    return distributions
+
+
+def _continuous_distributions(part, cols, W=None):
+    """
+    Return a list of tuples with distributions and the number (or weight)
+    of unknown values for the given continuous columns of a dense or CSC
+    array. Dense columns are sorted at once; distinct values are then
+    counted by `_valuecount.valuecount`.
+    """
+    def distribution(values, weights):
+        if not len(values):
+            return np.zeros((2, 0)), 0
+        vals = np.ones((2, len(values)))
+        vals[0] = values
+        if weights is None:
+            unknowns = np.isnan(values).sum()
+        else:
+            vals[1] = weights
+            unknowns = weights[np.isnan(values)].sum()
+        return np.array(_valuecount.valuecount(vals)), unknowns
+
+    distributions = []
+    for sub in _column_chunks(part, cols):
+        if sp.issparse(sub):
+            for lo, hi in zip(sub.indptr, sub.indptr[1:]):
+                values = sub.data[lo:hi]
+                order = np.argsort(values)
+                distributions.append(distribution(
+                    values[order],
+                    None if W is None else W[sub.indices[lo:hi][order]]))
+        elif W is None:
+            sub.sort(axis=0)
+            distributions.extend(distribution(values, None)
+                                 for values in sub.T)
+        else:
+            order = np.argsort(sub, axis=0)
+            distributions.extend(
+                distribution(values[ranks], W[ranks])
+                for values, ranks in zip(sub.T, order.T))
+    return distributions
+
+
+def _values_to_floats(var, values):
+    """
+    Convert a list of values of a primitive variable into an array of
+    floats; each distinct value is converted by `to_val` once.
+    """
+    if isinstance(var, ContinuousVariable):
+        try:
+            return np.array(values, dtype=float)
+        except (TypeError, ValueError):
+            pass
+    try:
+        converted = {val: var.to_val(val) for val in set(values)}
+    except TypeError:  # unhashable values
+        return np.array([var.to_val(val) for val in values], dtype=float)
+    return np.fromiter(map(converted.__getitem__, values), dtype=float,
+                       count=len(values))
+
+
+def _array_checksum(arr, cs=1):
+    """
+    Update the Adler-32 checksum with the contents of a dense or sparse
+    array; object arrays are hashed by references to objects.
+    """
+    if sp.issparse(arr):
+        arr = arr.tocsr()
+        for part in (arr.data, arr.indices, arr.indptr):
+            cs = zlib.adler32(np.ascontiguousarray(part), cs)
+        return cs
+    return zlib.adler32(np.ascontiguousarray(arr), cs)
+
+
+class _Changes:
+    """
+    The number of changes of a table's data, shared by tables that view
+    the same arrays
+    """
+    __slots__ = ("count", )
+
+    def __init__(self):
+        self.count = 0
+
+
+def _same_version(version1, version2):
+    """Tell whether two results of `Table._data_version` are the same"""
+    return version1[0] == version2[0] and \
+        all(a is b for a, b in zip(version1[1], version2[1]))
+
+
+def _nbytes(table):
+    """Return the memory taken by the table's arrays"""
+    nbytes = 0
+    for arr in (table.X, table._Y, table.metas, table.W, table.ids):
+        if sp.issparse(arr):
+            arr = arr.tocsr()
+            nbytes += arr.data.nbytes + arr.indices.nbytes + arr.indptr.nbytes
+        else:
+            nbytes += arr.nbytes
+    return nbytes
+
+
+def _is_prefix(arr, buf):
+    """Tell whether `arr` consists of the leading rows of `buf`"""
+    return (arr is buf or arr.base is buf) and \
+        arr.shape[1:] == buf.shape[1:] and arr.strides == buf.strides and \
+        arr.ctypes.data == buf.ctypes.data
+
+
 def _subarray(arr, rows, cols):
+    if sp.issparse(arr):
+        # index rows and columns separately; indexing sparse matrices with
+        # a cross product of indices selects elements one by one
+        if not sp.isspmatrix_csr(arr) and not sp.isspmatrix_csc(arr):
+            arr = arr.tocsr()
+        if rows is not ...:
+            arr = arr[rows]
+        if cols is not ...:
+            arr = arr[:, cols]
+        return arr
     return arr[_rxc_ix(rows, cols)]
 
 
@@ -55,12 +55,18 @@ class Variable(metaclass=VariableMeta):
     .. attribute:: attributes
 
         A dictionary with user-defined attributes of the variable
+
+    .. attribute:: storage_dtype
+
+        The numpy type in which columnar tables store the variable's values;
+        the base class stores them as Python objects.
     """
 
     _DefaultUnknownStr = {"?", ".", "", "NA", "~", None}
 
     _variable_types = []
     Unknown = ValueUnknown
+    storage_dtype = object
 
     def __init__(self, name="", compute_value=None):
         """
@@ -214,7 +220,11 @@ class ContinuousVariable(Variable):
 
     If the `number_of_decimals` is set manually, `adjust_decimals` is
     set to 0 to prevent changes by `to_val`.
+
+    Columnar tables store the values as `float64`; setting `storage_dtype`
+    to `np.float32` halves the memory at the cost of precision.
     """
+    storage_dtype = np.float64
 
     def __init__(self, name="", number_of_decimals=None):
         """
@@ -322,6 +332,19 @@ class DiscreteVariable(Variable):
         """ Return `True`: discrete variables are stored as floats. """
         return True
 
+    @property
+    def storage_dtype(self):
+        """
+        The smallest signed integer type that can hold indices of all values;
+        columnar tables store unknown values as -1.
+        """
+        n_values = len(self.values)
+        if n_values <= np.iinfo(np.int8).max:
+            return np.int8
+        if n_values <= np.iinfo(np.int16).max:
+            return np.int16
+        return np.int32
+
     def to_val(self, s):
         """
         Convert the given argument to a value of the variable (`float`).
@@ -504,9 +527,11 @@ class DiscreteVariable(Variable):
 class StringVariable(Variable):
     """
     Descriptor for string variables. String variables can only appear as
-    meta attributes.
+    meta attributes. Columnar tables store them as `int32` codes into an
+    array of distinct strings.
     """
     Unknown = None
+    storage_dtype = np.int32
 
     @staticmethod
     def is_primitive():
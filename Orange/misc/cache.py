@@ -1,3 +1,9 @@
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+
 def single_cache(f):
     last_args = ()
     last_kwargs = set()
@@ -14,3 +20,98 @@ def single_cache(f):
         return last_result
 
     return cached
+
+
+class LRUCache:
+    """
+    A cache that holds at most `maxsize` values whose total size (as
+    computed by `sizeof`) does not exceed `maxbytes`; the least recently
+    used values are evicted first. Values larger than `maxbytes` are not
+    stored.
+
+    Values are keyed by a tuple of objects, which are referred to by weak
+    references, and an optional hashable `extra` key. A value is discarded
+    when any of its objects is garbage collected. The cache is thread-safe.
+
+    A value expires `ttl` seconds after it was stored (never, if `ttl` is
+    `None`). If given, `invalidate` is called with the `extra` key and the
+    time when the value was stored before the value is returned; if it
+    returns `True`, the value is discarded.
+
+    .. attribute:: hits
+
+        The number of values that were returned from the cache.
+
+    .. attribute:: misses
+
+        The number of requested values that were not in the cache or had
+        expired.
+    """
+    def __init__(self, maxsize=128, maxbytes=None, sizeof=None, ttl=None,
+                 invalidate=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof or (lambda value: 0)
+        self.ttl = ttl
+        self.invalidate = invalidate
+        self.nbytes = 0
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, objects, extra=None, default=None):
+        key = (tuple(map(id, objects)), extra)
+        with self._lock:
+            entry = self._entries.get(key)
+            # ids of dead objects can be reused before callbacks remove them
+            if entry is None or any(ref() is not obj
+                                    for ref, obj in zip(entry[0], objects)):
+                self.misses += 1
+                return default
+            stored = entry[3]
+            if self.ttl is not None and time.monotonic() - stored > self.ttl \
+                    or self.invalidate is not None \
+                    and self.invalidate(extra, stored):
+                self._discard(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, objects, value, extra=None):
+        key = (tuple(map(id, objects)), extra)
+        size = self.sizeof(value)
+        discard = self._discard
+        refs = [weakref.ref(obj, lambda _, key=key: discard(key))
+                for obj in objects]
+        with self._lock:
+            self._discard(key)
+            if self.maxbytes is not None and size > self.maxbytes:
+                return
+            self._entries[key] = (refs, value, size, time.monotonic())
+            self.nbytes += size
+            while len(self._entries) > self.maxsize or \
+                    self.maxbytes is not None and self.nbytes > self.maxbytes:
+                self._discard(next(iter(self._entries)))
+
+    def _discard(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.nbytes -= entry[2]
+
+    def discard(self, predicate):
+        """Remove the values whose `extra` keys match the predicate."""
+        with self._lock:
+            for key in [key for key in self._entries if predicate(key[1])]:
+                self._discard(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = self.misses = 0
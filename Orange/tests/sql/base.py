@@ -150,6 +150,7 @@ class PostgresTest(unittest.TestCase):
     def setUpClass(cls):
         SqlTable.connection_pool = \
             psycopg2.pool.ThreadedConnectionPool(1, 1, **connection_params())
+        SqlTable.query_cache.clear()
         cls.conn, cls.iris = create_iris()
 
     @classmethod
@@ -7,6 +7,7 @@ from Orange.data.sql import table as sql_table
 from Orange.data import filter, ContinuousVariable, DiscreteVariable, \
     StringVariable, Table, Domain
 from Orange.data.sql.table import SqlTable
+from Orange.misc.cache import LRUCache
 from Orange.tests.sql.base import PostgresTest, sql_version, sql_test
 
 @sql_test
@@ -79,6 +80,19 @@ class SqlTableTests(PostgresTest):
         assert_almost_equal(sql_table.X, mat[:, :2])
         assert_almost_equal(sql_table.Y.flatten(), mat[:, 2])
 
+    def test_download_data_in_batches(self):
+        mat = np.random.randint(0, 2, (25, 3))
+        conn, table_name = self.create_sql_table(mat)
+        sql_table = SqlTable(conn, table_name,
+                             type_hints=Domain([], DiscreteVariable(
+                                 name='col2', values=['0', '1', '2'])))
+        sql_table.DOWNLOAD_BATCH_SIZE = 4
+        with self.assertRaises(ValueError):
+            sql_table.download_data(24)
+        sql_table.download_data(25)
+        assert_almost_equal(sql_table.X, mat[:, :2])
+        assert_almost_equal(sql_table.Y.flatten(), mat[:, 2])
+        self.assertEqual(len(sql_table), 25)
 
     def test_query_all(self):
         table = sql_table.SqlTable(self.conn, self.iris, inspect_values=True)
@@ -126,6 +140,79 @@ class SqlTableTests(PostgresTest):
         self.assertEqual(len(results), 140)
         self.assertSequenceEqual(results, all_results[10:])
 
+    def test_distributions_and_contingencies(self):
+        table = SqlTable(self.conn, self.iris, inspect_values=True)
+        iris = Table("iris")
+        for (dist, unknowns), (expected, _) in zip(
+                table._compute_distributions(),
+                iris._compute_distributions()):
+            assert_almost_equal(dist, expected)
+            self.assertEqual(unknowns, 0)
+
+        for (cont, unknowns), (expected, _) in zip(
+                table._compute_contingency(None, "iris"),
+                iris._compute_contingency(None, "iris")):
+            assert_almost_equal(cont[0], expected[0])
+            assert_almost_equal(cont[1], expected[1])
+            assert_almost_equal(unknowns, [0, 0, 0])
+
+    def test_query_exact_rows(self):
+        table = sql_table.SqlTable(self.conn, self.iris)
+        all_results = list(table._query())
+
+        results = list(table._query(rows=[149, 0, 75, 0]))
+        self.assertSequenceEqual(
+            results, [all_results[i] for i in (149, 0, 75, 0)])
+        self.assertEqual(list(table._query(rows=[3, 1000])),
+                         [all_results[3]])
+        self.assertEqual(list(table._query(rows=[])), [])
+
+    def test_fetch_rows_in_blocks(self):
+        table = sql_table.SqlTable(self.conn, self.iris)
+        all_results = list(table._query(
+            table.domain.variables + table.domain.metas))
+        queries = []
+        query = table._query
+
+        def counting_query(*args, **kwargs):
+            queries.append(kwargs.get("rows"))
+            return query(*args, **kwargs)
+
+        table._query = counting_query
+        for i in (5, 6, 99, 0, 120):
+            self.assertSequenceEqual(list(table[i].x), all_results[i][:4])
+        self.assertEqual(queries, [slice(0, 100), slice(100, 200)])
+        self.assertEqual(table[130, 0], all_results[130][0])
+        self.assertEqual(len(queries), 2)
+        with self.assertRaises(IndexError):
+            table[150]
+
+    def test_query_cache(self):
+        cache = LRUCache()
+        table = sql_table.SqlTable(self.conn, self.iris)
+        table.query_cache = cache
+        stats = table._get_stats(table.domain.variables)
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+        copy = table.copy()
+        self.assertIs(copy.query_cache, cache)
+        self.assertEqual(copy._get_stats(table.domain.variables), stats)
+        self.assertEqual(len(copy), 150)
+        self.assertEqual(len(table), 150)
+        self.assertEqual((cache.hits, cache.misses), (2, 2))
+        self.assertEqual(table.checksum(), copy.checksum())
+
+        filtered = filter.Values([filter.FilterContinuous(
+            table.domain[0], filter.FilterContinuous.Greater, 0)])(table)
+        self.assertEqual(len(filtered), 150)
+        self.assertEqual(cache.misses, 3)
+        self.assertNotEqual(filtered.checksum(), table.checksum())
+
+        table.invalidate_cache()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(len(table), 150)
+        self.assertEqual(cache.misses, 4)
+
     def test_type_hints(self):
         table = sql_table.SqlTable(self.conn, self.iris, inspect_values=True)
         self.assertEqual(len(table.domain), 5)
@@ -457,3 +544,12 @@ class SqlTableTests(PostgresTest):
         self.assertGreater(len(table.domain.metas), 0)
         attr = table.domain[-1]
         self.assertIsInstance(attr, variable_type)
+
+
+class NormalizeQueryTest(unittest.TestCase):
+    def test_normalize_query(self):
+        normalize = sql_table.normalize_query
+        self.assertEqual(normalize("SELECT  a,\n  b FROM t "),
+                         "SELECT a, b FROM t")
+        query = """SELECT "a  b" FROM t WHERE c = 'x  y'"""
+        self.assertEqual(normalize(" " + query), query)
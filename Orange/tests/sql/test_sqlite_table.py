@@ -0,0 +1,193 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from Orange.data import filter, ContinuousVariable, DiscreteVariable, \
+    StringVariable, Table, Domain
+from Orange.data.sql.table import SqliteTable, SqlTable
+
+
+class SqliteTableTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.database = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+        self.iris = Table("iris")
+        with sqlite3.connect(self.database) as conn:
+            conn.execute("""
+                CREATE TABLE iris (
+                    "sepal length" real,
+                    "sepal width" real,
+                    "petal length" real,
+                    "petal width" real,
+                    "iris" text
+                )""")
+            class_var = self.iris.domain.class_var
+            conn.executemany(
+                "INSERT INTO iris VALUES (?, ?, ?, ?, ?)",
+                [list(x) + [class_var.values[int(y)]]
+                 for x, y in zip(self.iris.X, self.iris.Y)])
+            conn.execute("CREATE TABLE nulls (a real, b integer, c text)")
+            conn.executemany(
+                "INSERT INTO nulls VALUES (?, ?, ?)",
+                [(1.5, 1, "x"), (None, 2, "y"), (2.5, None, None),
+                 (3.5, 1, "x")])
+            conn.execute("CREATE TABLE fruits (name text)")
+            conn.executemany("INSERT INTO fruits VALUES (?)",
+                             [("Apple", ), ("apple", ), ("pear", )])
+        self.tables = []
+
+    def tearDown(self):
+        for table in self.tables:
+            table.connection_pool.closeall()
+        SqlTable.query_cache.clear()
+        os.remove(self.database)
+
+    def table(self, name, **kwargs):
+        table = SqliteTable(self.database, name, **kwargs)
+        self.tables.append(table)
+        return table
+
+    def test_domain(self):
+        table = self.table("iris", inspect_values=True)
+        self.assertEqual(len(table), 150)
+        self.assertEqual(table.approx_len(), 150)
+        self.assertEqual(
+            [type(var) for var in table.domain.variables],
+            [ContinuousVariable] * 4 + [DiscreteVariable])
+        self.assertEqual(table.domain["iris"].values,
+                         self.iris.domain.class_var.values)
+
+        table = self.table("nulls")
+        self.assertIsInstance(table.domain["b"], ContinuousVariable)
+        self.assertIsInstance(table.domain["c"], StringVariable)
+
+    def test_data(self):
+        table = self.table("iris", inspect_values=True)
+        np.testing.assert_almost_equal(table.X[:, :4], self.iris.X)
+        np.testing.assert_equal(table.X[:, 4], self.iris.Y)
+        self.assertEqual(list(table[120].x), list(table.X[120]))
+        rows = list(table._query(table.domain.variables))
+        self.assertEqual(
+            list(table._query(table.domain.variables, rows=[7, 3])),
+            [rows[7], rows[3]])
+        rows = list(table._query())
+        self.assertEqual(list(table._query(rows=[2, 0])), [rows[2], rows[0]])
+        with patch.object(table, "_execute_sql_query",
+                          wraps=table._execute_sql_query) as execute:
+            self.assertEqual(list(table._query(rows=[7, 3, 149])),
+                             [rows[7], rows[3], rows[149]])
+        self.assertIn("LIMIT 150", execute.call_args[0][0])
+
+    def test_download_data(self):
+        class_var = self.iris.domain.class_var
+        table = self.table("iris", type_hints=Domain(
+            [], [], metas=[DiscreteVariable("iris", values=class_var.values)]))
+        table.download_data()
+        np.testing.assert_almost_equal(table.X, self.iris.X)
+        np.testing.assert_equal(table.metas[:, 0], self.iris.Y)
+
+    def test_stats(self):
+        table = self.table("iris", inspect_values=True)
+        stats = table._compute_basic_stats()
+        for stat, column in zip(stats, self.iris.X.T):
+            np.testing.assert_almost_equal(
+                stat[:4], [column.min(), column.max(), column.mean(),
+                           column.std(ddof=1)])
+        self.assertEqual(tuple(stats[4][4:]), (0, 150))
+
+        table = self.table("nulls")
+        self.assertEqual(table._compute_basic_stats([0])[0],
+                         (1.5, 3.5, 2.5, 1.0, 1, 3))
+
+    def test_distributions(self):
+        table = self.table("iris", inspect_values=True)
+        dist, unknowns = table._compute_distributions(["iris"])[0]
+        np.testing.assert_equal(dist, [50, 50, 50])
+        self.assertEqual(unknowns, 0)
+
+        table = self.table("nulls", inspect_values=True)
+        (dist_a, unknowns_a), (dist_b, unknowns_b) = \
+            table._compute_distributions(["a", "b"])
+        np.testing.assert_equal(dist_a, [[1.5, 2.5, 3.5], [1, 1, 1]])
+        self.assertEqual(unknowns_a, 1)
+        np.testing.assert_equal(dist_b, [2, 1])
+        self.assertEqual(unknowns_b, 1)
+
+    def test_contingency(self):
+        table = self.table("iris", inspect_values=True)
+        (values, counts), unknowns = \
+            table._compute_contingency([3], "iris")[0]
+        column = self.iris.X[:, 3]
+        np.testing.assert_almost_equal(values, np.unique(column))
+        for i in range(3):
+            np.testing.assert_equal(
+                counts[i],
+                [np.sum((column == value) & (self.iris.Y == i))
+                 for value in np.unique(column)])
+        np.testing.assert_equal(unknowns, [0, 0, 0])
+
+    def test_filters(self):
+        table = self.table("iris", inspect_values=True)
+        setosa = filter.SameValue(table.domain["iris"], "Iris-setosa")(table)
+        self.assertIsInstance(setosa, SqliteTable)
+        self.assertEqual(len(setosa), 50)
+
+        long = filter.Values([filter.FilterContinuous(
+            table.domain[0], filter.FilterContinuous.Greater, 7)])(table)
+        self.assertEqual(len(long), np.sum(self.iris.X[:, 0] > 7))
+        self.assertEqual(long._compute_distributions(["iris"])[0][0][2],
+                         len(long))
+
+        table = self.table("nulls")
+        x = filter.Values([filter.FilterString(
+            table.domain["c"], filter.FilterString.Equal, "X",
+            case_sensitive=False)])(table)
+        self.assertEqual(len(x), 2)
+        self.assertEqual(len(filter.IsDefined()(table)), 2)
+
+    def test_case_sensitive_filters(self):
+        table = self.table("fruits")
+        name = table.domain["name"]
+
+        def filtered(oper, ref, case_sensitive):
+            return len(filter.Values([filter.FilterString(
+                name, oper, ref, case_sensitive=case_sensitive)])(table))
+
+        FilterString = filter.FilterString
+        self.assertEqual(filtered(FilterString.StartsWith, "A", True), 1)
+        self.assertEqual(filtered(FilterString.StartsWith, "A", False), 2)
+        self.assertEqual(filtered(FilterString.Contains, "PP", True), 0)
+        self.assertEqual(filtered(FilterString.Contains, "PP", False), 2)
+        self.assertEqual(filtered(FilterString.Equal, "apple", True), 1)
+
+    def test_invalidate_cache(self):
+        # queries on other tables mention column "a", whose quoted name
+        # is the same as the quoted name of table "a"
+        names = ["a", "a_b", "data_a"]
+        with sqlite3.connect(self.database) as conn:
+            for name in names:
+                conn.execute("CREATE TABLE %s (a real)" % name)
+                conn.execute("INSERT INTO %s VALUES (1)" % name)
+        tables = [self.table(name) for name in names]
+        stats = [table._get_stats(table.domain.variables) for table in tables]
+        cache = SqlTable.query_cache
+        self.assertEqual(len(cache), 3)
+        tables[0].invalidate_cache()
+        self.assertEqual(len(cache), 2)
+        for table, table_stats in zip(tables, stats):
+            self.assertEqual(table._get_stats(table.domain.variables),
+                             table_stats)
+        self.assertEqual(cache.hits, 2)
+
+    def test_no_sampling(self):
+        table = self.table("iris")
+        with self.assertRaises(NotImplementedError):
+            table.sample_time(1)
+
+
+if __name__ == "__main__":
+    unittest.main()
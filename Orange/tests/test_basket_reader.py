@@ -1,11 +1,14 @@
 # coding=utf-8
 import io
 import functools
+import gzip
 import os, tempfile
 import unittest
+from unittest.mock import patch
 
 import numpy as np
 
+from Orange.data import _io
 from Orange.data.io import BasketFormat
 
 
@@ -84,6 +87,50 @@ class TestBasketReader(unittest.TestCase):
         table = BasketFormat().read_file(fname)
         self.assertEqual(len(table.domain.variables), 4)
 
+    def test_reads_beyond_initial_buffers(self):
+        fle = tempfile.NamedTemporaryFile(suffix=".basket", delete=False)
+        fle.write("\n".join("a=1, b={}, c".format(i)
+                            for i in range(3000)).encode("utf-8"))
+        fle.close()
+        try:
+            table = BasketFormat().read_file(fle.name)
+        finally:
+            os.remove(fle.name)
+        self.assertEqual(len(table), 3000)
+        X = table.X.todense()
+        np.testing.assert_almost_equal(X[:, 1].A.ravel(), np.arange(3000))
+        np.testing.assert_almost_equal(X[:, 2].sum(), 3000)
+
+
+class TestCompressedBasketReader(unittest.TestCase):
+    def test_read_gzipped(self):
+        fle = tempfile.NamedTemporaryFile(suffix=".basket.gz", delete=False)
+        fle.close()
+        try:
+            with gzip.open(fle.name, "wt") as f:
+                f.write("a=1,b=2\nb=3,c")
+            table = BasketFormat().read_file(fle.name)
+            self.assertEqual(["a", "b", "c"],
+                             [var.name for var in table.domain.variables])
+            np.testing.assert_almost_equal(table.X.todense(),
+                                           np.array([[1, 2, 0], [0, 3, 1]]))
+        finally:
+            os.remove(fle.name)
+
+    @patch.object(_io, "READ_CHUNK", 3)
+    def test_read_in_chunks(self):
+        fle = tempfile.NamedTemporaryFile(suffix=".basket.gz", delete=False)
+        fle.close()
+        try:
+            with gzip.open(fle.name, "wb") as f:
+                f.write(b"a=1,b=22\r\nb=3,c\rc=4\n")
+            table = BasketFormat().read_file(fle.name)
+            np.testing.assert_almost_equal(
+                table.X.todense(),
+                np.array([[1, 22, 0], [0, 3, 1], [0, 0, 4]]))
+        finally:
+            os.remove(fle.name)
+
 
 if __name__ == "__main__":
     unittest.main()
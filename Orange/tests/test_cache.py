@@ -0,0 +1,50 @@
+import unittest
+from unittest.mock import patch
+
+from Orange.misc.cache import LRUCache
+
+
+class Key:
+    pass
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_eviction(self):
+        now = 0
+        cache = LRUCache(maxsize=2, ttl=10)
+        with patch("time.monotonic", lambda: now):
+            cache.set((), 1, "a")
+            cache.set((), 2, "b")
+            self.assertEqual(cache.get((), "a"), 1)
+            cache.set((), 3, "c")
+            self.assertIsNone(cache.get((), "b"))
+            self.assertEqual(cache.get((), "a"), 1)
+            now = 11
+            self.assertIsNone(cache.get((), "a"))
+            self.assertEqual((cache.hits, cache.misses), (2, 2))
+            self.assertEqual(len(cache), 1)
+
+    def test_invalidate(self):
+        stale = set()
+        cache = LRUCache(invalidate=lambda extra, stored: extra in stale)
+        cache.set((), 1, "a")
+        cache.set((), 2, "b")
+        stale.add("a")
+        self.assertIsNone(cache.get((), "a"))
+        self.assertEqual(cache.get((), "b"), 2)
+        cache.discard(lambda extra: extra == "b")
+        self.assertIsNone(cache.get((), "b"))
+        self.assertEqual(len(cache), 0)
+
+    def test_objects(self):
+        key = Key()
+        cache = LRUCache()
+        cache.set((key, ), 1, "a")
+        self.assertEqual(cache.get((key, ), "a"), 1)
+        self.assertIsNone(cache.get((Key(), ), "a"))
+        del key
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+import unittest
+
+import numpy as np
+
+from Orange import data
+from Orange.data import (ContinuousVariable, DiscreteVariable, StringVariable,
+                         Domain)
+from Orange.data.columnar import ColumnarTable, CodedColumn
+from Orange.tests import test_table as tabletests
+
+
+class InterfaceTest(tabletests.InterfaceTest):
+    def setUp(self):
+        super().setUp()
+        self.table = ColumnarTable.from_table(self.domain, self.table)
+
+
+class ColumnarTableTest(unittest.TestCase):
+    def setUp(self):
+        self.a = DiscreteVariable("ca", values="xyz")
+        self.b = ContinuousVariable("cb")
+        self.b.storage_dtype = np.float32
+        self.c = DiscreteVariable("cc", values="pq")
+        self.s = StringVariable("cs")
+        self.domain = Domain([self.a, self.b], self.c, [self.s])
+        self.X = np.array([[0, 1.5], [2, np.nan], [np.nan, 3], [1, 4.25]])
+        self.Y = np.array([1, 0, 1, np.nan])
+        self.metas = np.array([["foo"], ["bar"], ["foo"], ["foo"]], object)
+        self.table = ColumnarTable.from_numpy(
+            self.domain, self.X, self.Y, self.metas)
+
+    def test_storage_dtypes(self):
+        columns = self.table.columns_data
+        self.assertEqual(columns[self.a].dtype, np.int8)
+        np.testing.assert_equal(columns[self.a], [0, 2, -1, 1])
+        self.assertEqual(columns[self.b].dtype, np.float32)
+        self.assertIsInstance(columns[self.s], CodedColumn)
+        np.testing.assert_equal(columns[self.s].codes, [1, 0, 1, 1])
+        self.assertEqual(len(self.table), 4)
+        self.assertLess(self.table.nbytes, self.X.nbytes + self.Y.nbytes)
+
+    def test_lazy_matrices(self):
+        table = self.table
+        col, sparse = table.get_column_view(self.c)
+        self.assertFalse(sparse)
+        np.testing.assert_equal(col, self.Y)
+        self.assertIsNone(table._dense_X)
+
+        np.testing.assert_equal(table.X, self.X)
+        np.testing.assert_equal(table.Y, self.Y)
+        np.testing.assert_equal(table.metas, self.metas)
+        self.assertNotIn(self.a, table.columns_data)
+
+        table.X[0, 0] = 1
+        self.assertEqual(table[0, self.a], "y")
+        table.compact()
+        self.assertIsNone(table._dense_X)
+        self.assertEqual(table.columns_data[self.a][0], 1)
+
+    def test_select_rows(self):
+        table = ColumnarTable.from_table(self.domain, self.table, [3, 1])
+        self.assertIsInstance(table, ColumnarTable)
+        self.assertIsNone(table._dense_X)
+        np.testing.assert_equal(table.X, self.X[[3, 1]])
+        np.testing.assert_equal(table.metas, self.metas[[3, 1]])
+        np.testing.assert_equal(table.ids, self.table.ids[[3, 1]])
+
+    def test_rejects_sparse(self):
+        from scipy.sparse import csr_matrix
+        with self.assertRaises(ValueError):
+            ColumnarTable.from_numpy(
+                Domain([self.b]), csr_matrix(np.ones((2, 1))))
+
+    def test_filter_strings(self):
+        from Orange.data import filter as data_filter
+        self.metas[:, 0] = ["Foo", "bar", "foo", "baz"]
+        table = ColumnarTable.from_numpy(
+            self.domain, self.X, self.Y, self.metas)
+        FilterString = data_filter.FilterString
+
+        def filtered(*conditions):
+            result = data_filter.Values(conditions)(table)
+            self.assertIsInstance(result, ColumnarTable)
+            self.assertIsInstance(
+                result.get_column_view(self.s)[0], CodedColumn)
+            return list(result.get_column_view(self.s)[0])
+
+        self.assertEqual(
+            filtered(FilterString(self.s, FilterString.Equal, "foo")),
+            ["foo"])
+        self.assertEqual(
+            filtered(FilterString(self.s, FilterString.Equal, "foo",
+                                  case_sensitive=False)),
+            ["Foo", "foo"])
+        self.assertEqual(
+            filtered(FilterString(self.s, FilterString.StartsWith, "ba")),
+            ["bar", "baz"])
+        self.assertEqual(
+            filtered(FilterString(self.s, FilterString.Between, "bar",
+                                  "baz")),
+            ["bar", "baz"])
+        self.assertEqual(
+            filtered(data_filter.FilterStringList(self.s, ["FOO", "Baz"],
+                                                  case_sensitive=False)),
+            ["Foo", "foo", "baz"])
+        self.assertIsNone(table._dense_metas)
+
+    def test_coded_column(self):
+        col = CodedColumn.from_values(["b", "a", "b", "c"])
+        self.assertEqual(col.codes.dtype, np.int32)
+        self.assertEqual(col[2], "b")
+        self.assertEqual(list(col[1:3]), ["a", "b"])
+        np.testing.assert_equal(col == "b", [True, False, True, False])
+        np.testing.assert_equal(col.map(lambda s: s > "a"),
+                                [True, False, True, True])
+        np.testing.assert_equal(np.asarray(col), ["b", "a", "b", "c"])
+
+    def test_coded_column_missing(self):
+        col = CodedColumn.from_values(["b", None, "None", "b"])
+        np.testing.assert_equal(col.codes, [1, -1, 0, 1])
+        self.assertEqual(list(col.categories), ["None", "b"])
+        self.assertIsNone(col[1])
+        self.assertEqual(list(col), ["b", None, "None", "b"])
+        np.testing.assert_equal(col == "None", [False, False, True, False])
+        np.testing.assert_equal(col != "b", [False, True, True, False])
+        np.testing.assert_equal(col.map(lambda s: True),
+                                [True, False, True, True])
+        self.assertNotEqual(
+            col.checksum(),
+            CodedColumn.from_values(["b", "None", "None", "b"]).checksum())
+
+    def test_checksum(self):
+        cs = self.table.checksum()
+        self.assertEqual(cs, self.table.checksum())
+        self.assertNotEqual(cs, self.table.checksum(include_metas=False))
+        table = ColumnarTable.from_numpy(
+            self.domain, self.X, self.Y, self.metas)
+        table.metas
+        table.X
+        self.assertEqual(table.checksum(), cs)
+
+        rows = table[[0, 2, 3]].checksum()
+        metas = self.metas.copy()
+        metas[1, 0] = "foo"
+        other = ColumnarTable.from_numpy(self.domain, self.X, self.Y, metas)
+        self.assertEqual(other[[0, 2, 3]].checksum(), rows)
+
+    def test_lazy_from_table(self):
+        source = data.Table.from_numpy(self.domain, self.X, self.Y,
+                                       self.metas)
+        calls = []
+
+        def double(table):
+            calls.append(len(table))
+            return table.get_column_view(self.b)[0] * 2
+
+        d = ContinuousVariable("cd")
+        d.compute_value = double
+        e = ContinuousVariable("ce")
+        e.compute_value = double
+        domain = Domain([self.a, d, e], self.c, [self.s])
+        table = data.Table.from_table(domain, source, [3, 0, 1], lazy=True)
+        self.assertIsInstance(table, ColumnarTable)
+        self.assertEqual(len(table), 3)
+        self.assertEqual(calls, [])
+
+        np.testing.assert_equal(table.get_column_view(d)[0], [8.5, 3, np.nan])
+        self.assertEqual(calls, [4])
+        np.testing.assert_equal(table.get_column_view(self.a)[0], [1, 0, 2])
+        self.assertEqual(list(table.get_column_view(self.s)[0]),
+                         ["foo", "foo", "bar"])
+
+        sub = table[[0, 2]]
+        self.assertEqual(calls, [4])
+        np.testing.assert_equal(sub.X, [[1, 8.5, 8.5], [2, np.nan, np.nan]])
+        self.assertEqual(calls, [4, 4])
+        np.testing.assert_equal(table.Y, [np.nan, 1, 0])
+
+    def test_discrete_storage_dtype(self):
+        var = DiscreteVariable("cd", values=[str(i) for i in range(200)])
+        self.assertEqual(var.storage_dtype, np.int16)
+
+
+if __name__ == "__main__":
+    unittest.main()
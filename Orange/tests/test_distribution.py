@@ -341,6 +341,45 @@ class Domain_Distribution_Test(unittest.TestCase):
         np.testing.assert_almost_equal(ddist[2], freqs)
         np.testing.assert_almost_equal(ddist[-1], [50, 50, 50])
 
+    def test_compute_distributions_weighted(self):
+        domain = data.Domain(
+            [data.DiscreteVariable("d", values="abc"),
+             data.ContinuousVariable("c")],
+            data.DiscreteVariable("y", values="ab"),
+            [data.ContinuousVariable("m")])
+        X = np.array([[0, 1.5], [2, np.nan], [np.nan, 1.5], [0, 0.5]])
+        d = data.Table.from_numpy(
+            domain, X, np.array([0, 1, 1, 0]),
+            np.array([[1], [1], [2], [np.nan]], dtype=object),
+            np.array([1, 2, 3, 4]))
+        dists = d._compute_distributions(["m", "c", "d", "y"])
+        expected = [
+            ([[1, 2], [3, 3]], 4),
+            ([[0.5, 1.5], [4, 4]], 2),
+            ([5, 0, 2], 3),
+            ([5, 5], 0)]
+        for (dist, unknowns), (exp_dist, exp_unknowns) in zip(dists,
+                                                              expected):
+            np.testing.assert_almost_equal(dist, exp_dist)
+            self.assertEqual(unknowns, exp_unknowns)
+
+        domain = data.Domain(domain.attributes, domain.class_var)
+        X = sp.csc_matrix(np.nan_to_num(X))
+        d = data.Table.from_numpy(domain, X, np.array([0, 1, 1, 0]))
+        with self.assertWarns(ResourceWarning):
+            (dist, unknowns), = d._compute_distributions(["d"])
+        np.testing.assert_almost_equal(dist, [0, 0, 1])
+        self.assertEqual(unknowns, 0)
+
+    def test_compute_distributions_negative(self):
+        domain = data.Domain([data.DiscreteVariable("a", values="ab"),
+                              data.DiscreteVariable("b", values="ab")])
+        for X in ([[0, -1], [1, 0]], [[-1, 0], [1, 0]]):
+            X = np.array(X, dtype=float)
+            for X in (X, sp.csc_matrix(X)):
+                d = data.Table.from_numpy(domain, X)
+                with self.assertRaises(ValueError):
+                    d._compute_distributions()
 
     #noinspection PyTypeChecker
     def test_sparse_get_distributions(self):
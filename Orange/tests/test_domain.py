@@ -402,6 +402,16 @@ class TestDomainInit(unittest.TestCase):
         unpickled_domain = pickle.loads(pickle.dumps(domain))
         self.assertTrue(hasattr(unpickled_domain, '_known_domains'))
 
+    def test_conversion_cache_is_bounded(self):
+        from Orange.data.domain import CONVERSION_CACHE_SIZE
+        domain = Domain([ContinuousVariable("x")])
+        sources = [Domain([ContinuousVariable("x")])
+                   for _ in range(CONVERSION_CACHE_SIZE + 5)]
+        conversions = [domain.get_conversion(source) for source in sources]
+        self.assertEqual(len(domain._known_domains), CONVERSION_CACHE_SIZE)
+        self.assertIs(domain.get_conversion(sources[-2]), conversions[-2])
+        self.assertIsNot(domain.get_conversion(sources[0]), conversions[0])
+
     def test_different_domains_with_same_attributes_are_equal(self):
         domain1 = Domain([])
         domain2 = Domain([])
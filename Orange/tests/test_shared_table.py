@@ -0,0 +1,64 @@
+import gc
+import pickle
+import sys
+import unittest
+from multiprocessing import Pool
+
+import numpy as np
+
+from Orange import data
+from Orange.data.sharedmem import SharedTable, share_table
+
+
+def _column_sums(handle):
+    table = handle.attach()
+    return table.X.sum(axis=0), list(table.ids), table.metas.shape
+
+
+@unittest.skipIf(sys.version_info < (3, 8),
+                 "Shared memory requires Python 3.8")
+class SharedTableTest(unittest.TestCase):
+    def test_attach(self):
+        d = data.Table("zoo")
+        with share_table(d) as handle:
+            self.assertIsInstance(handle, SharedTable)
+            self.assertIsInstance(handle.arrays["X"], tuple)
+            self.assertIsInstance(handle.arrays["metas"], np.ndarray)
+            table = pickle.loads(pickle.dumps(handle)).attach()
+            np.testing.assert_equal(table.X, d.X)
+            np.testing.assert_equal(table.Y, d.Y)
+            np.testing.assert_equal(table.metas, d.metas)
+            np.testing.assert_equal(table.ids, d.ids)
+            self.assertEqual(table.domain, d.domain)
+            self.assertEqual(table[3], d[3])
+            self.assertFalse(table.X.flags.writeable)
+            with self.assertRaises(ValueError):
+                table.X[0, 0] = 1
+            with self.assertRaises(ValueError):
+                table.append(d[0])
+            table.ensure_copy()
+            table.X[0, 0] = 42
+            self.assertNotEqual(d.X[0, 0], 42)
+            self.assertEqual(table.checksum(), table.checksum())
+
+    def test_views_outlive_table(self):
+        d = data.Table("iris")
+        with share_table(d) as handle:
+            train = handle.attach()[:100]
+            column = handle.attach().X[:, 2]
+            gc.collect()
+            np.testing.assert_almost_equal(train.X.sum(), d.X[:100].sum())
+            np.testing.assert_almost_equal(column.sum(), d.X[:, 2].sum())
+            self.assertAlmostEqual(handle.attach().X.sum(), d.X.sum())
+
+    def test_worker_process(self):
+        d = data.Table("iris")
+        with share_table(d) as handle, Pool(1) as pool:
+            sums, ids, metas_shape = pool.apply(_column_sums, (handle,))
+        np.testing.assert_almost_equal(sums, d.X.sum(axis=0))
+        self.assertEqual(ids, list(d.ids))
+        self.assertEqual(metas_shape, (150, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
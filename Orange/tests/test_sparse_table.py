@@ -1,6 +1,11 @@
-from scipy.sparse import csr_matrix
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
 
 from Orange import data
+from Orange.data import table as table_module
 from Orange.tests import test_table as tabletests
 
 
@@ -36,3 +41,51 @@ class InterfaceTest(tabletests.InterfaceTest):
     def test_value_assignment(self):
         with self.assertRaises(ValueError):
             super().test_value_assignment()
+
+
+class FromTableTest(unittest.TestCase):
+    def setUp(self):
+        self.attrs = [data.ContinuousVariable("a%i" % i) for i in range(4)]
+        self.class_var = data.DiscreteVariable("c", values="xy")
+        self.domain = data.Domain(self.attrs, self.class_var)
+        self.X = np.array([[0, 1, 0, 2], [0, 0, 0, 0], [3, 0, 0, 1]])
+        self.table = data.Table.from_numpy(
+            self.domain, csr_matrix(self.X), np.array([0, 1, 1]))
+
+    def test_select_columns_and_rows(self):
+        domain = data.Domain([self.attrs[3], self.attrs[0]])
+        table = data.Table.from_table(domain, self.table, [2, 0])
+        self.assertTrue(issparse(table.X))
+        np.testing.assert_equal(table.X.toarray(), [[1, 3], [2, 0]])
+
+    def test_mixed_and_computed_columns(self):
+        doubled = data.ContinuousVariable("doubled")
+        doubled.compute_value = lambda table: table.X[:, 1] * 2
+        domain = data.Domain(
+            [self.attrs[1], doubled, self.class_var], self.class_var)
+        table = data.Table.from_table(domain, self.table, [0, 2])
+        self.assertTrue(issparse(table.X))
+        np.testing.assert_equal(table.X.toarray(), [[1, 2, 0], [0, 0, 1]])
+        np.testing.assert_equal(table.Y, [0, 1])
+
+    def test_slices_each_array_once(self):
+        domain = data.Domain(
+            [self.attrs[3], self.class_var, self.attrs[0], self.attrs[2]])
+        with patch("Orange.data.table._subarray",
+                   side_effect=table_module._subarray) as subarray:
+            table = data.Table.from_table(domain, self.table, [2, 0])
+        self.assertEqual(subarray.call_count, 2)
+        self.assertTrue(issparse(table.X))
+        np.testing.assert_equal(table.X.toarray(),
+                                [[1, 1, 3, 0], [2, 0, 0, 0]])
+
+    def test_computed_objects(self):
+        named = data.StringVariable("named")
+        named.compute_value = lambda table: np.array(
+            ["r%i" % i for i in range(table.X.shape[0])],
+            dtype=object)
+        domain = data.Domain([self.attrs[0]], metas=[self.attrs[1], named])
+        table = data.Table.from_table(domain, self.table)
+        self.assertEqual(table.metas.dtype, object)
+        self.assertEqual(table.metas.tolist(),
+                         [[1, "r0"], [0, "r1"], [0, "r2"]])
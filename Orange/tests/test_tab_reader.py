@@ -1,10 +1,11 @@
 import io
 import unittest
+from unittest.mock import patch
 
 import numpy as np
 
 from Orange.data import ContinuousVariable, DiscreteVariable
-from Orange.data.io import TabDelimFormat
+from Orange.data.io import TabDelimFormat, SparseRowsAccumulator
 
 
 class TestTabReader(unittest.TestCase):
@@ -86,3 +87,85 @@ class TestTabReader(unittest.TestCase):
 
         self.assertSequenceEqual(t2.domain['x'].values, 'abcdgh')
         np.testing.assert_almost_equal(t2.X.ravel(), [5, 4, 0, 2, 1])
+
+    def test_read_in_chunks(self):
+        samplefile = """\
+        a\tb\tw\ts
+        c\td\tweight\tstring
+        \tclass\t\t
+        1.25\tq\t0.5\thello
+        3\tp\t2\tworld
+
+        ?\tq\t1
+        2.125\tr\t1\tagain
+        """
+        reader = TabDelimFormat()
+        reader.CHUNK_SIZE = 2
+        table = reader._read_file(io.StringIO(samplefile))
+
+        self.assertEqual(len(table), 4)
+        self.assertEqual(len(table.ids), 4)
+        self.assertSequenceEqual(table.domain.class_var.values, "pqr")
+        self.assertEqual(table.domain["a"].number_of_decimals, 3)
+        np.testing.assert_almost_equal(table.X.ravel(),
+                                       [1.25, 3, np.nan, 2.125])
+        np.testing.assert_almost_equal(table.Y, [1, 0, 1, 2])
+        np.testing.assert_almost_equal(table.W, [0.5, 2, 1, 1])
+        self.assertEqual(list(table.metas[:, 0]),
+                         ["hello", "world", "", "again"])
+
+    def test_chunks_are_not_padded(self):
+        samplefile = "a\ts\nc\tstring\n\t\n 1 \t{}\n2\n".format("x" * 1000)
+        reader = TabDelimFormat()
+        f = io.StringIO(samplefile)
+        reader.read_header(f)
+        chunk, = reader.read_chunks(f)
+        self.assertEqual(chunk.dtype, object)
+        self.assertEqual(chunk.tolist(), [["1", "x" * 1000], ["2", ""]])
+
+    def test_read_basket_column(self):
+        samplefile = """\
+        ba\titems
+        c\tbasket
+        \tbasket
+        1\tx=2, y
+        2\t
+        3\tz=0.5, x
+        """
+        reader = TabDelimFormat()
+        reader.CHUNK_SIZE = 2
+        table = reader._read_file(io.StringIO(samplefile))
+        self.assertEqual([var.name for var in table.domain.attributes],
+                         ["ba", "x", "y", "z"])
+        np.testing.assert_almost_equal(
+            table.X.todense(),
+            [[1, 2, 1, 0], [2, 0, 0, 0], [3, 1, 0, 0.5]])
+
+    def test_sparse_rows_duplicates(self):
+        rows = SparseRowsAccumulator(capacity=1)
+        rows.add_row([("x", 1), ("y", 2)])
+        rows.add_row([("y", 3), ("x", 4)])
+        self.assertRaises(ValueError, rows.add_row, [("x", 1), ("x", 2)])
+
+    def test_write_in_blocks(self):
+        samplefile = """\
+        wa\twb\twc
+        c\td\tc
+        \t\tclass
+        1.5\tx\t3
+        ?\ty\t4
+        2.25\t?\t
+        """
+        table = TabDelimFormat()._read_file(io.StringIO(samplefile))
+        outf = io.StringIO()
+        outf.close = lambda: None
+        with patch.object(TabDelimFormat, "WRITE_BLOCK_SIZE", 2), \
+                patch.object(TabDelimFormat, "_format_column",
+                             side_effect=TabDelimFormat._format_column) \
+                as format_column:
+            TabDelimFormat.write_file(outf, table)
+        self.assertEqual([len(args[1]) for args, _ in
+                          format_column.call_args_list],
+                         [2, 2, 2, 1, 1, 1])
+        self.assertEqual(outf.getvalue().splitlines()[3:],
+                         ["1.50\tx\t3", "?\ty\t4", "2.25\t?\t?"])
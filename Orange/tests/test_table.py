@@ -7,6 +7,7 @@ import random
 from Orange import data
 from Orange.data import filter
 from Orange.data import Unknown
+from Orange.data import table as table_module
 
 import numpy as np
 from unittest.mock import Mock, MagicMock, patch
@@ -438,6 +439,39 @@ class TableTestCase(unittest.TestCase):
         del x[4:9]
         self.assertEqual(crc, d.checksum(True))
 
+    def test_checksum_changes(self):
+        import pickle
+
+        d = data.Table("zoo")
+        crc = d.checksum()
+        with patch.object(table_module, "_array_checksum") as array_checksum:
+            self.assertEqual(crc, d.checksum())
+            array_checksum.assert_not_called()
+        self.assertNotEqual(crc, d.checksum(include_metas=False))
+        self.assertEqual(
+            pickle.loads(pickle.dumps(d)).checksum(include_metas=False),
+            d.checksum(include_metas=False))
+
+        d[0, 1] = 1 - d[0, 1]
+        crc2 = d.checksum()
+        self.assertNotEqual(crc, crc2)
+
+        d.X[0, 1] = 1 - d.X[0, 1]
+        self.assertEqual(d.checksum(), crc2)
+        d.mark_changed()
+        self.assertEqual(d.checksum(), crc)
+
+        v = d[:10]
+        v[0, 1] = 1 - v[0, 1]
+        self.assertEqual(d.checksum(), crc2)
+
+        d.X = d.X.copy()
+        d.X[0, 1] = 1 - d.X[0, 1]
+        self.assertEqual(d.checksum(), crc)
+
+        d.shuffle()
+        self.assertNotEqual(d.checksum(), crc)
+
     def test_bool(self):
         d = data.Table("iris")
         self.assertTrue(d)
@@ -597,6 +631,49 @@ class TableTestCase(unittest.TestCase):
         with self.assertRaises(ValueError):
             d.extend(x)
 
+    def test_append_grows_capacity(self):
+        d = data.Table("iris")
+        capacities = set()
+        for i in range(200):
+            d.append([i, 2, 3, 4, 0])
+            capacities.add(len(d._buffers[0]))
+        self.assertEqual(len(d), 350)
+        self.assertLess(len(capacities), 5)
+        self.assertEqual(d[349, 0], 199)
+        self.assertTrue(d.is_copy())
+
+        d.insert(0, [5, 6, 7, 8, 1])
+        self.assertEqual(d[0], [5, 6, 7, 8, 1])
+        self.assertEqual(d[350, 0], 199)
+
+        x = d[:5]
+        with self.assertRaises(ValueError):
+            d.append([1, 2, 3, 4, 0])
+        y = x[1:3]
+        del x
+        with self.assertRaises(ValueError):
+            d.append([1, 2, 3, 4, 0])
+        y.ensure_copy()
+        d.append([1, 2, 3, 4, 0])
+        self.assertEqual(len(d), 352)
+
+        # arrays that the table did not allocate are not written into
+        X = np.zeros((3, 4))
+        d = data.Table.from_numpy(d.domain, X, np.zeros((3, 1)))
+        d.append([1, 2, 3, 4, 0])
+        self.assertFalse(np.shares_memory(d.X, X))
+        np.testing.assert_equal(X, 0)
+        self.assertEqual(d[3, 0], 1)
+
+    def test_extend_with_lists(self):
+        d = data.Table("test3")
+        rows = [[1, "1", 1], [None, "0", "?"], [3.5, 0, None]]
+        d.extend(rows)
+        self.assertEqual(len(d), 3)
+        for row, expected in zip(d, rows):
+            self.assertEqual(row, expected)
+        self.assertEqual(len(set(d.ids)), 3)
+
     def test_convert_through_append(self):
         d = data.Table("iris")
         dom2 = data.Domain([d.domain[0], d.domain[2], d.domain[4]])
@@ -610,6 +687,90 @@ class TableTestCase(unittest.TestCase):
             self.assertEqual(e[0], e2[0])
             self.assertEqual(e[1], e3[0])
 
+    def test_convert_through_extend(self):
+        d = data.Table("iris")
+        calls = []
+
+        def double(table):
+            calls.append(len(table))
+            return table.get_column_view(0)[0] * 2
+
+        doubled = data.ContinuousVariable("doubled")
+        doubled.compute_value = double
+        dom2 = data.Domain([d.domain[2], doubled], d.domain.class_var)
+        d2 = data.Table(dom2)
+        d2.extend(list(d[:5]))
+        self.assertEqual(calls, [5])
+        d2.extend(d[5:10])
+        self.assertEqual(calls, [5, 5])
+        np.testing.assert_equal(d2.X[:, 0], d.X[:10, 2])
+        np.testing.assert_equal(d2.X[:, 1], d.X[:10, 0] * 2)
+        np.testing.assert_equal(d2.Y, d.Y[:10])
+        np.testing.assert_equal(d2.ids, d.ids[:10])
+
+        X, Y, metas = dom2.convert_batch([d[0], [1, 2, 0]])
+        np.testing.assert_equal(X, [[d[0, 2], d[0, 0] * 2], [1, 2]])
+        np.testing.assert_equal(Y, [[d[0, 4]], [0]])
+        self.assertEqual(metas.shape, (2, 0))
+
+    def test_conversion_cache(self):
+        d = data.Table("iris")
+        calls = []
+
+        def double(table):
+            calls.append(len(table))
+            return table.get_column_view(0)[0] * 2
+
+        doubled = data.ContinuousVariable("doubled")
+        doubled.compute_value = double
+        dom = data.Domain([doubled], d.domain.class_var)
+
+        t1 = data.Table.from_table(dom, d)
+        t2 = data.Table.from_table(dom, d)
+        self.assertEqual(calls, [150])
+        np.testing.assert_equal(t1.X, t2.X)
+        self.assertFalse(np.shares_memory(t1.X, t2.X))
+        t2.X[0, 0] = 42
+        self.assertEqual(data.Table.from_table(dom, d).X[0, 0], t1.X[0, 0])
+        data.Table.from_table(dom, d, [0, 1])
+        self.assertEqual(calls, [150] * 2)
+
+        d[:10].X[0, 0] = 100
+        d[:10][0, 0] = 100
+        self.assertEqual(data.Table.from_table(dom, d).X[0, 0], 200)
+        d.X[0, 0] = 1
+        d.mark_changed()
+        self.assertEqual(data.Table.from_table(dom, d).X[0, 0], 2)
+        d.X = d.X.copy()
+        d.X[0, 0] = 3
+        self.assertEqual(data.Table.from_table(dom, d).X[0, 0], 6)
+        self.assertEqual(calls, [150] * 5)
+
+    def test_nested_conversions(self):
+        d = data.Table("iris")
+        calls = []
+
+        def double(table):
+            calls.append(len(table))
+            return table.get_column_view(0)[0] * 2
+
+        doubled = data.ContinuousVariable("doubled")
+        doubled.compute_value = double
+        pre_domain = data.Domain([doubled])
+
+        def from_pre(i):
+            def compute(table):
+                return table.from_table(pre_domain, table).X[:, 0] + i
+            return compute
+
+        columns = [data.ContinuousVariable("c{}".format(i))
+                   for i in range(20)]
+        for i, var in enumerate(columns):
+            var.compute_value = from_pre(i)
+        t = data.Table.from_table(data.Domain(columns), d)
+        self.assertEqual(calls, [150])
+        np.testing.assert_equal(t.X[0], d.X[0, 0] * 2 + np.arange(20))
+
     def test_pickle(self):
         import pickle
 
@@ -688,6 +849,23 @@ class TableTestCase(unittest.TestCase):
         finally:
             os.remove("test-zoo.tab")
 
+    def test_save_compressed(self):
+        iris = data.Table("iris")
+        for compression in (".gz", ".bz2", ".xz"):
+            filename = "test-iris.tab" + compression
+            try:
+                iris.save(filename)
+                with open(filename, "rb") as f:
+                    self.assertNotEqual(f.read(5), b"sepal")
+                iris2 = data.Table(filename)
+                self.assertEqual(iris2.name, "test-iris")
+                np.testing.assert_almost_equal(iris.X, iris2.X)
+                np.testing.assert_almost_equal(iris.Y, iris2.Y)
+                iris2 = data.Table("test-iris")
+                self.assertEqual(len(iris2), len(iris))
+            finally:
+                os.remove(filename)
+
     def test_save_pickle(self):
         table = data.Table("iris")
         try:
@@ -699,6 +877,70 @@ class TableTestCase(unittest.TestCase):
         finally:
             os.remove("iris.pickle")
 
+    def test_iter_batches(self):
+        iris = data.Table("iris")
+        batches = list(data.Table.iter_batches("iris", 40))
+        self.assertEqual([len(batch) for batch in batches], [40, 40, 40, 30])
+        self.assertTrue(all(batch.domain is batches[0].domain
+                            for batch in batches))
+        self.assertEqual(batches[0].domain.class_var.values,
+                         iris.domain.class_var.values)
+        np.testing.assert_almost_equal(
+            np.vstack([batch.X for batch in batches]), iris.X)
+        np.testing.assert_almost_equal(
+            np.hstack([batch.Y for batch in batches]), iris.Y)
+        self.assertEqual(batches[0].name, "iris")
+
+    def test_batches(self):
+        iris = data.Table("iris")
+        batches = list(iris.batches(40))
+        self.assertEqual([len(batch) for batch in batches], [40, 40, 40, 30])
+        self.assertTrue(all(batch.domain is iris.domain for batch in batches))
+        self.assertTrue(np.shares_memory(batches[1].X, iris.X))
+        np.testing.assert_equal(batches[3].X, iris.X[120:])
+        np.testing.assert_equal(batches[3].ids, iris.ids[120:])
+
+    def test_iteration_fast_path(self):
+        zoo = data.Table("zoo")
+        rows = list(zoo)
+        self.assertEqual(len(rows), len(zoo))
+        for i in (0, 50, len(zoo) - 1):
+            self.assertEqual(rows[i], zoo[i])
+            self.assertEqual(rows[i].id, zoo.ids[i])
+            self.assertEqual(rows[i].row_index, i)
+            self.assertEqual(rows[i]["name"], zoo[i, "name"])
+        self.assertFalse(hasattr(rows[0], "__dict__"))
+        rows[3][0] = 1 - rows[3][0]
+        self.assertEqual(zoo[3, 0], rows[3][0])
+
+        zoo.set_weights(2)
+        self.assertEqual(data.Instance(zoo.domain, zoo[0]).weight, 2)
+
+    def test_save_memmap(self):
+        table = data.Table("zoo")
+        table.set_weights(2)
+        try:
+            table.save("zoo.mmt")
+            table2 = data.Table.from_file("zoo.mmt")
+            self.assertIsInstance(table2.X, np.memmap)
+            np.testing.assert_almost_equal(table.X, table2.X)
+            np.testing.assert_almost_equal(table.Y, table2.Y)
+            np.testing.assert_almost_equal(table.W, table2.W)
+            np.testing.assert_equal(table.metas, table2.metas)
+            self.assertIs(table.domain[0], table2.domain[0])
+            self.assertEqual(len(table2.ids), len(table))
+
+            rows = table2[10:20]
+            self.assertIsInstance(rows.X, np.memmap)
+            np.testing.assert_almost_equal(rows.X, table.X[10:20])
+
+            table2[0, 0] = 42
+            self.assertEqual(data.Table.from_file("zoo.mmt")[0, 0],
+                             table[0, 0])
+            del table2, rows
+        finally:
+            os.remove("zoo.mmt")
+
     def test_from_numpy(self):
         import random
 
@@ -894,6 +1136,95 @@ class TableTestCase(unittest.TestCase):
         f = filter.FilterDiscrete(d.domain.class_var, values=[2, data.Table])
         self.assertRaises(TypeError, d._filter_values, f)
 
+    def test_valueFilter_nested(self):
+        d = data.Table("zoo")
+        FilterString, FilterDiscrete = filter.FilterString, filter.FilterDiscrete
+        name = d.domain["name"]
+        hair = d.domain["hair"]
+        f = filter.Values([
+            FilterDiscrete(d.domain.class_var, values=["mammal"]),
+            filter.Values([FilterString(name, FilterString.StartsWith, "b"),
+                           FilterString(name, FilterString.Contains, "ar")],
+                          conjunction=False),
+            FilterDiscrete(hair, values=None)])
+        expected = [
+            str(e["name"]) for e in d
+            if e.get_class() == "mammal" and
+            (str(e["name"]).startswith("b") or "ar" in str(e["name"]))]
+        self.assertTrue(expected)
+        self.assertEqual([str(e["name"]) for e in f(d)], expected)
+
+        f.negate = True
+        self.assertEqual(len(f(d)), len(d) - len(expected))
+
+    def test_valueFilter_in_chunks(self):
+        d = data.Table("zoo")
+        f = filter.Values([
+            filter.FilterString("name", filter.FilterString.EndsWith, "N",
+                                case_sensitive=False),
+            filter.FilterDiscrete(d.domain.class_var, values=["fish"])],
+            conjunction=False)
+        expected = f(d)
+        d.FILTER_CHUNK_SIZE = 7
+        d.FILTER_N_JOBS = 3
+        self.assertEqual(list(f(d).ids), list(expected.ids))
+
+    def test_valueFilter_indexed(self):
+        d = data.Table("iris")
+        d.X[::7, 2] = np.nan
+        v = d.columns
+        FilterContinuous = filter.FilterContinuous
+        conditions = [
+            FilterContinuous(v.petal_length, FilterContinuous.Between,
+                             min=4.5, max=5.1),
+            FilterContinuous(v.petal_length, FilterContinuous.Outside,
+                             min=1.5, max=5.1),
+            FilterContinuous(v.petal_length, FilterContinuous.Less, ref=1.5),
+            FilterContinuous(v.petal_length, FilterContinuous.GreaterEqual,
+                             ref=6),
+            FilterContinuous(v.petal_length, FilterContinuous.Equal,
+                             ref=5.1),
+            filter.FilterDiscrete(v.iris, values=["Iris-setosa"])]
+        f_and = [filter.Values([filter.FilterDiscrete(v.iris, values=[1, 2]),
+                                cond]) for cond in conditions]
+        expected = [list(f(d).ids) for f in f_and]
+        expected_all = [list(filter.Values([c])(d).ids) for c in conditions]
+
+        d.create_index(v.petal_length)
+        d.create_index(v.iris)
+        old_block_size = data.table._ColumnIndex.BLOCK_SIZE
+        data.table._ColumnIndex.BLOCK_SIZE = 4
+        try:
+            for f, ids in zip(f_and, expected):
+                self.assertEqual(list(f(d).ids), ids)
+            for c, ids in zip(conditions, expected_all):
+                self.assertEqual(list(filter.Values([c])(d).ids), ids)
+        finally:
+            data.table._ColumnIndex.BLOCK_SIZE = old_block_size
+        self.assertIsNotNone(d._indexes[2])
+
+        index = d._indexes[2]
+        self.assertIsNotNone(index)
+
+        # indexes are rebuilt after changes through views and direct writes
+        view = d[:10]
+        view[0, v.petal_length] = 100
+        f = filter.Values([FilterContinuous(
+            v.petal_length, FilterContinuous.Greater, ref=50)])
+        self.assertEqual(list(f(d).ids), [d.ids[0]])
+        self.assertIsNot(d._indexes[2], index)
+        d.X[1, 2] = 200
+        d.mark_changed()
+        self.assertEqual(list(f(d).ids), list(d.ids[:2]))
+        index = d._indexes[2]
+        self.assertEqual(list(f(d).ids), list(d.ids[:2]))
+        self.assertIs(d._indexes[2], index)
+
+        d.drop_index(v.petal_length)
+        self.assertNotIn(2, d._indexes)
+        with self.assertRaises(ValueError):
+            data.Table("zoo").create_index("name")
+
     def test_valueFilter_string_case_sens(self):
         d = data.Table("zoo")
         col = d[:, "name"].metas[:, 0]
@@ -74,3 +74,43 @@ class TestTabReader(unittest.TestCase):
         self.read_easy(csv_file, "Feature ")
         self.read_easy(csv_file_nh, "Var000")
 
+
+    def test_read_batches(self):
+        file = NamedTemporaryFile("wt", delete=False)
+        filename = file.name
+        try:
+            file.write(csv_file + "3.0, 4, 2\n\n4.0, ?, 1\n")
+            file.close()
+            batches = list(TxtFormat().read_batches(filename, 2))
+            self.assertEqual([len(batch) for batch in batches], [2, 1, 1])
+            self.assertIs(batches[0].domain, batches[1].domain)
+            np.testing.assert_almost_equal(
+                np.vstack([batch.X for batch in batches]),
+                [[1, 1.3, 5], [2, 42, 7], [3, 4, 2], [4, np.nan, 1]])
+        finally:
+            os.remove(filename)
+
+    def test_read_parallel(self):
+        file = NamedTemporaryFile("wt", delete=False)
+        filename = file.name
+        try:
+            file.write(csv_file + "".join(
+                "{}, {}.5, {}\n".format(i, i, i % 3) for i in range(100)))
+            file.close()
+            expected = TxtFormat().read_file(filename)
+
+            reader = TxtFormat()
+            reader.PARALLEL_SIZE = 0
+            reader.N_JOBS = 3
+            ranges = reader.split_ranges(filename, 0, 3)
+            self.assertEqual(len(ranges), 3)
+            with open(filename, "rb") as f:
+                content = f.read()
+            for start, stop in ranges:
+                self.assertTrue(start == 0 or content[start - 1] == ord("\n"))
+
+            table = reader.read_file(filename)
+            self.assertEqual(table.domain, expected.domain)
+            np.testing.assert_almost_equal(table.X, expected.X)
+        finally:
+            os.remove(filename)
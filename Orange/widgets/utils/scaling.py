@@ -10,14 +10,11 @@ from Orange.widgets.settings import Setting
 from Orange.widgets.utils.datacaching import getCached, setCached
 
 
-# noinspection PyBroadException
 def checksum(x):
+    """Return the table's checksum (see `Table.checksum`) or `None`."""
     if x is None:
         return None
-    try:
-        return x.checksum()
-    except:
-        return float('nan')
+    return x.checksum()
 
 
 def get_variable_values_sorted(variable):